@@ -6,14 +6,13 @@ from __future__ import annotations
 
 from pathlib import Path
 import logging
-import shutil
 import sys
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from src.logutil import ValidationError, ProcessingError, copy_with_integrity
+from src.logutil import ValidationError, ProcessingError, copy_with_integrity, discard_tree
 from src.archive_utils import extract_archive
 
 
@@ -57,10 +56,12 @@ def run(
         # 2) unzip -> final MR DICOM directory
         final_dir.parent.mkdir(parents=True, exist_ok=True)
         if final_dir.exists():
-            shutil.rmtree(final_dir, ignore_errors=True)
+            # Moved into scratch (same filesystem) and deleted in the
+            # background; otherwise removed in place.
+            discard_tree(final_dir, trash_dir=scratch)
         final_dir.mkdir(parents=True, exist_ok=True)
         try:
-            extract_archive(bak, final_dir, prefer_7z=True)
+            extract_archive(bak, final_dir, prefer_7z=True, logger=log)
         except Exception as exc:
             raise ProcessingError(f"MRI extraction failed: {exc}") from exc
         log.info("MRI extracted to final dir: %s", final_dir)
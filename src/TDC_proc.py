@@ -6,6 +6,7 @@ from __future__ import annotations
 
 from pathlib import Path
 import logging
+import os
 import shutil
 import tempfile
 import sys
@@ -16,7 +17,13 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from src.localdb_anon import anonymize_in_place
-from src.logutil import ProcessingError, StepTimer, ValidationError, copy_with_integrity
+from src.logutil import (
+    ProcessingError,
+    StepTimer,
+    ValidationError,
+    copy_with_integrity,
+    discard_tree,
+)
 from src.archive_utils import extract_archive
 
 
@@ -82,11 +89,18 @@ def _expand_workspace_zips(workspace: Path, log: logging.Logger) -> None:
         else:
             dest_dir = zip_path.with_suffix("")
         dest_dir.mkdir(parents=True, exist_ok=True)
-        extract_archive(zip_path, dest_dir, prefer_7z=True)
+        extract_archive(zip_path, dest_dir, prefer_7z=True, logger=log)
         zip_path.unlink()
         log.info("Expanded zip -> %s", dest_dir)
 
 
+def _same_filesystem(src: Path, dst_dir: Path) -> bool:
+    try:
+        return os.stat(src).st_dev == os.stat(dst_dir).st_dev
+    except OSError:
+        return False
+
+
 def run(
     *,
     root: Path,
@@ -103,6 +117,8 @@ def run(
     legacy_filename_rules: bool = False,
     step_results: Optional[Dict[str, Any]] = None,
     status_mgr: Optional[Any] = None,
+    prefer_rename: bool = False,
+    results_lock: Optional[Any] = None,
 ) -> dict:
     log = logger or logging.getLogger(__name__)
     case_dir = root / case
@@ -146,7 +162,7 @@ def run(
         # 2) unzip -> temp (keep on failure for debugging)
         tmp = Path(tempfile.mkdtemp(dir=scratch, prefix="tdc_unzipped_"))
         try:
-            extract_archive(bak, tmp, prefer_7z=True)
+            extract_archive(bak, tmp, prefer_7z=True, logger=log)
         except Exception as exc:
             raise ProcessingError(f"TDC extraction failed: {exc}") from exc
         log.info("TDC extracted: %s", tmp)
@@ -178,7 +194,7 @@ def run(
         # 5) stage destination in scratch
         staged_session = staged_session_root / session_name
         if staged_session.exists():
-            shutil.rmtree(staged_session, ignore_errors=True)
+            discard_tree(staged_session)
         staged_session.mkdir(parents=True, exist_ok=True)
 
         # 6) process contents of the session
@@ -199,7 +215,7 @@ def run(
                     dest_dir = staged_session / child.stem
                 dest_dir.mkdir(parents=True, exist_ok=True)
                 try:
-                    extract_archive(child, dest_dir, prefer_7z=True)
+                    extract_archive(child, dest_dir, prefer_7z=True, logger=log)
                 except Exception as exc:
                     raise ProcessingError(f"Failed to expand {child}: {exc}") from exc
                 log.info("Expanded zip -> %s", dest_dir)
@@ -222,14 +238,18 @@ def run(
         step_name = "local.db anonymization"
         if step_results is not None:
             with StepTimer(
-                logger=log, step_name=step_name, results=step_results, status_mgr=status_mgr
+                logger=log,
+                step_name=step_name,
+                results=step_results,
+                status_mgr=status_mgr,
+                lock=results_lock,
             ):
                 summary = anonymize_in_place(
-                    staged_db, date_shift_days=date_shift_days, make_temp_proof=False, logger=log
+                    staged_db, date_shift_days=date_shift_days, logger=log
                 )
         else:
             summary = anonymize_in_place(
-                staged_db, date_shift_days=date_shift_days, make_temp_proof=False, logger=log
+                staged_db, date_shift_days=date_shift_days, logger=log
             )
         log.info("Anonymized local.db (tables: %s)", len(summary.get("tables", [])))
 
@@ -258,7 +278,14 @@ def run(
         while target.exists():
             target = tdc_dir / f"{session_name}__{n}"
             n += 1
-        shutil.copytree(staged_session, target)
+        if prefer_rename and _same_filesystem(staged_session, tdc_dir):
+            # The staged session is not reused after this point, so moving it
+            # is equivalent to the copy and avoids rewriting every file.
+            os.rename(staged_session, target)
+            staged_session = target
+            staged_db = target / "local.db"
+        else:
+            shutil.copytree(staged_session, target)
         log.info("TDC final: %s", target)
     except ValidationError:
         raise
@@ -1,9 +1,10 @@
 # PURPOSE: Extract and create archives with optional 7-Zip preference.
 # INPUTS: Archive paths, destination dirs, and preference flags.
 # OUTPUTS: Extracted files or created zip archives.
-# NOTES: Falls back to zipfile if 7-Zip is unavailable.
+# NOTES: Falls back to unzip, then zipfile, if 7-Zip is unavailable.
 from __future__ import annotations
 
+import logging
 import os
 import shutil
 import subprocess
@@ -11,6 +12,9 @@ import zipfile
 from pathlib import Path
 from typing import Optional
 
+_UNZIP = shutil.which("unzip")
+_WIN_ILLEGAL = str.maketrans(':<>|"?*', "_" * 7)
+
 
 def find_7z() -> Optional[Path]:
     for env_key in ("SEVEN_ZIP", "SEVENZIP", "7Z"):
@@ -32,7 +36,48 @@ def find_7z() -> Optional[Path]:
     return Path(which) if which else None
 
 
-def extract_archive(archive_path: Path, dest_dir: Path, prefer_7z: bool = True) -> None:
+def _member_dest(dest_dir: Path, name: str) -> Optional[Path]:
+    # Same rules as ZipFile.extract: drop drive letters, empty, "." and ".."
+    # components so a member can never land outside dest_dir; on Windows also
+    # replace reserved characters and strip trailing dots/spaces.
+    arcname = name.replace("\\", "/") if os.sep == "\\" else name
+    arcname = os.path.splitdrive(arcname)[1]
+    parts = [p for p in arcname.split("/") if p not in ("", ".", "..")]
+    if os.sep == "\\":
+        parts = [q for q in (p.translate(_WIN_ILLEGAL).rstrip(" .") for p in parts) if q]
+    if not parts:
+        return None
+    return dest_dir.joinpath(*parts)
+
+
+def _extract_zip(zf: zipfile.ZipFile, dest_dir: Path) -> None:
+    made: set[Path] = set()
+    for info in zf.infolist():
+        dest = _member_dest(dest_dir, info.filename)
+        if dest is None:
+            continue
+        if info.is_dir():
+            if dest not in made:
+                dest.mkdir(parents=True, exist_ok=True)
+                made.add(dest)
+            continue
+        if dest.parent not in made:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            made.add(dest.parent)
+        if info.file_size == 0:
+            open(dest, "wb").close()
+            continue
+        with zf.open(info) as src, open(dest, "wb", buffering=0) as out:
+            shutil.copyfileobj(src, out, min(info.file_size, 1 << 20))
+
+
+def extract_archive(
+    archive_path: Path,
+    dest_dir: Path,
+    prefer_7z: bool = True,
+    logger: Optional[logging.Logger] = None,
+) -> None:
+    log = logger or logging.getLogger(__name__)
     dest_dir.mkdir(parents=True, exist_ok=True)
     archive_path = Path(archive_path)
 
@@ -48,8 +93,41 @@ def extract_archive(archive_path: Path, dest_dir: Path, prefer_7z: bool = True)
             return
 
     if zipfile.is_zipfile(archive_path):
+        if _UNZIP:
+            # An empty password and no stdin: encrypted members fail instead
+            # of blocking on a password prompt.
+            cmd = [_UNZIP, "-q", "-o", "-P", "", str(archive_path), "-d", str(dest_dir)]
+            proc = subprocess.run(
+                cmd, stdin=subprocess.DEVNULL, capture_output=True, text=True
+            )
+            if proc.returncode > 1:
+                raise RuntimeError(
+                    f"unzip failed (code={proc.returncode}): {proc.stdout} {proc.stderr}"
+                )
+            if proc.returncode == 1:
+                # 1 covers both harmless warnings and members unzip skipped
+                # (encrypted, unsupported method); only the former is accepted.
+                with zipfile.ZipFile(archive_path, "r") as zf:
+                    missing = [
+                        info.filename
+                        for info in zf.infolist()
+                        if not info.is_dir()
+                        and (dest := _member_dest(dest_dir, info.filename)) is not None
+                        and not dest.is_file()
+                    ]
+                if missing:
+                    raise RuntimeError(
+                        f"unzip skipped {len(missing)} member(s) (code=1): "
+                        f"{', '.join(missing[:5])} {proc.stderr}"
+                    )
+                log.warning(
+                    "unzip reported warnings for %s: %s",
+                    archive_path,
+                    (proc.stderr or proc.stdout).strip(),
+                )
+            return
         with zipfile.ZipFile(archive_path, "r") as zf:
-            zf.extractall(dest_dir)
+            _extract_zip(zf, dest_dir)
         return
 
     raise RuntimeError(f"Unsupported archive format: {archive_path}")
@@ -5,17 +5,19 @@
 from __future__ import annotations
 
 import argparse
+import logging
+import os
 import sys
-import shutil
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-import MRI_proc
-import TDC_proc
 from src.annon_logs import get_annon_logs_dir
 from src.pipeline_steps.applog_step import install_tdc_log
 from src.pipeline_steps.cleanup_artifacts import cleanup_artifacts
@@ -37,25 +39,75 @@ from src.logutil import (
     ValidationError,
     ProcessingError,
     UnexpectedError,
+    copy_file_buffered,
+    discard_tree,
+    fast_rmtree,
+    link_or_copy,
+    copy_file_hashed,
+    flush_log_file,
+    resolve_hash_algo,
 )
 from src.pipeline_config import add_bool_arg, resolve_config
 from src.policy import RunPolicy, policy_from_args_and_cfg
-from src.reporting.manifest import build_manifest_payload, file_metadata, write_manifest
-from src.selftest.runner import run_self_test
 
+# A plan line kept unformatted: (str.format template, positional args).
+PlanEntry = tuple[str, tuple[Any, ...]]
 
-def _validate_zip(path: Path, label: str, raw_value: Optional[str] = None) -> None:
-    if not path.exists() or not path.is_file():
+
+def _validate_zip(path: Path, label: str, raw_value: str | None = None) -> None:
+    if not path.is_file():
         extra = f" raw={raw_value!r}" if raw_value else ""
         raise ValidationError(f"{label} not found: {path}.{extra}")
-    if path.suffix.lower() != ".zip":
+    if not path.name.lower().endswith(".zip"):
         extra = f" raw={raw_value!r}" if raw_value else ""
         raise ValidationError(f"{label} must be a .zip: {path}.{extra}")
 
 
+def _stat_or_none(path: Path) -> os.stat_result | None:
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
 def _assert_exists(path: Path, label: str) -> None:
-    if not path.exists():
-        raise ProcessingError(f"Missing expected {label}: {path}")
+    try:
+        os.lstat(path)
+    except OSError:
+        raise ProcessingError(f"Missing expected {label}: {path}") from None
+
+
+def _missing_or_none(path: str) -> str | None:
+    try:
+        os.lstat(path)
+    except OSError:
+        return path
+    return None
+
+
+def _assert_all_exist(paths: list[str], label: str, max_workers: int = 8) -> None:
+    if not paths:
+        return
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as pool:
+        missing = [p for p in pool.map(_missing_or_none, paths) if p is not None]
+    if missing:
+        raise ProcessingError(f"Missing expected {label}: {missing[0]}")
+
+
+def _make_dirs(dirs: list[Path]) -> None:
+    # makedirs creates missing parents itself, so any target that is an
+    # ancestor of another target needs no call of its own.
+    targets = {os.path.normpath(d) for d in dirs}
+    ancestors: set[str] = set()
+    for target in targets:
+        parent = os.path.dirname(target)
+        while parent and parent not in ancestors:
+            ancestors.add(parent)
+            if os.path.dirname(parent) == parent:
+                break
+            parent = os.path.dirname(parent)
+    for leaf in sorted(targets - ancestors):
+        os.makedirs(leaf, exist_ok=True)
 
 
 def _build_plan(
@@ -69,65 +121,133 @@ def _build_plan(
     manifest_path: Path,
     run_id: str,
     case: str,
-    mri_input: Optional[Path],
-    tdc_input: Optional[Path],
-    pdf_input: Optional[Path],
+    mri_input: Path | None,
+    tdc_input: Path | None,
+    pdf_input: Path | None,
     skip_mri: bool,
     skip_tdc: bool,
     test_mode: bool,
     allow_workspace_zips: bool,
     clean_scratch: bool,
     legacy_names: bool,
-) -> List[str]:
-    plan: List[str] = []
-    plan.append(f"Create case dir: {case_dir}")
-    plan.append(f"Create output dir: {misc_dir}")
-    plan.append(f"Create output dir: {mr_dir}")
-    plan.append(f"Create output dir: {tdc_dir}")
-    plan.append(f"Create output dir: {case_dir / 'annon_logs'}")
-    plan.append(f"Create output dir: {case_dir / 'run_logs'}")
-    plan.append(
-        f"TDC Raw output dir created if TDC produces it: {tdc_dir / '<session>' / 'Raw'}"
-    )
-    plan.append(f"Create scratch dir: {scratch}")
+) -> list[PlanEntry]:
+    # Entries stay as (template, args) until the manifest is written; see
+    # _render_plan.
+    plan: list[PlanEntry] = [
+        ("Create case dir: {}", (case_dir,)),
+        ("Create output dir: {}", (misc_dir,)),
+        ("Create output dir: {}", (mr_dir,)),
+        ("Create output dir: {}", (tdc_dir,)),
+        ("Create output dir: {}", (case_dir / "annon_logs",)),
+        ("Create output dir: {}", (case_dir / "run_logs",)),
+        (
+            "TDC Raw output dir created if TDC produces it: {}",
+            (tdc_dir / "<session>" / "Raw",),
+        ),
+        ("Create scratch dir: {}", (scratch,)),
+    ]
     if not skip_mri and mri_input:
-        plan.append(
-            f"Copy MRI zip to scratch backup: {mri_input} -> {scratch / (mri_input.name + '.bak')}"
-        )
-        final_dir = mr_dir / mri_input.stem
-        plan.append(f"Extract MRI zip into final dir: {final_dir}")
+        plan += [
+            (
+                "Copy MRI zip to scratch backup: {} -> {}",
+                (mri_input, scratch / (mri_input.name + ".bak")),
+            ),
+            ("Extract MRI zip into final dir: {}", (mr_dir / mri_input.stem,)),
+        ]
     if not skip_tdc and tdc_input:
-        plan.append(
-            f"Copy TDC zip to scratch backup: {tdc_input} -> {scratch / (tdc_input.name + '.bak')}"
-        )
-        plan.append("Extract TDC zip into temp under scratch")
-        plan.append(f"Copy Logs/ to {misc_dir / 'Logs'} if present")
-        plan.append(
-            "Stage TDC session in scratch/TDC_staged and copy top-level dirs as directories"
-        )
-        plan.append("Expand Raw.zip or timestamp zips into directories if present")
-        if allow_workspace_zips:
-            plan.append("Allow zip archives under TDC workspace (override enabled)")
-        else:
-            plan.append("Disallow zip archives under TDC workspace")
+        plan += [
+            (
+                "Copy TDC zip to scratch backup: {} -> {}",
+                (tdc_input, scratch / (tdc_input.name + ".bak")),
+            ),
+            ("Extract TDC zip into temp under scratch", ()),
+            ("Copy Logs/ to {} if present", (misc_dir / "Logs",)),
+            (
+                "Stage TDC session in scratch/TDC_staged and copy top-level dirs as directories",
+                (),
+            ),
+            ("Expand Raw.zip or timestamp zips into directories if present", ()),
+            (
+                ("Allow zip archives under TDC workspace (override enabled)", ())
+                if allow_workspace_zips
+                else ("Disallow zip archives under TDC workspace", ())
+            ),
+        ]
         if test_mode:
-            plan.append("Test-mode: keep staging lightweight (no zipping)")
-        plan.append(f"Copy staged TDC session to: {tdc_dir / '<session_name>'}")
+            plan.append(("Test-mode: keep staging lightweight (no zipping)", ()))
+        plan.append(("Copy staged TDC session to: {}", (tdc_dir / "<session_name>",)))
     if pdf_input:
         pdf_name = f"{case}_TreatmentReport.pdf" if legacy_names else pdf_input.name
-        plan.append(f"Copy treatment report to: {misc_dir / pdf_name}")
-    plan.append(f"Write log file to: {log_dir / (case + '__' + run_id + '.log')}")
-    plan.append(f"Write manifest to: {manifest_path}")
+        plan.append(("Copy treatment report to: {}", (misc_dir / pdf_name,)))
+    plan += [
+        ("Write log file to: {}", (log_dir / f"{case}__{run_id}.log",)),
+        ("Write manifest to: {}", (manifest_path,)),
+    ]
     if clean_scratch:
-        plan.append(f"Delete scratch dir: {scratch}")
+        plan.append(("Delete scratch dir: {}", (scratch,)))
     return plan
 
 
+def _console_level(level: Any) -> int:
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(str(level).upper())
+    return value if isinstance(value, int) else logging.INFO
+
+
+def _render_plan(plan: list[PlanEntry]) -> list[str]:
+    return [template.format(*args) if args else template for template, args in plan]
+
+
+def _find_stray_pdf(roots: list[Path], exclude: Path, max_depth: int = 2) -> Path | None:
+    # Reports land in Misc/ or the case root; searching a level or two down
+    # avoids stat'ing every file of the extracted MR/TDC trees.
+    level = [r for r in roots if r.is_dir()]
+    seen: set[str] = set()
+    for _ in range(max_depth):
+        next_level: list[Path] = []
+        for root in level:
+            if str(root) in seen:
+                continue
+            seen.add(str(root))
+            try:
+                with os.scandir(root) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            next_level.append(Path(entry.path))
+                        elif entry.name.lower().endswith(".pdf"):
+                            if Path(entry.path) != exclude:
+                                return Path(entry.path)
+            except OSError:
+                continue
+        level = next_level
+    return None
+
+
+def _artifact_lines(
+    artifacts: dict[str, Any],
+    policy: RunPolicy,
+    log_file: Path,
+    manifest_path: Path,
+) -> list[str]:
+    outputs = artifacts.get("outputs", {})
+    lines: list[str] = []
+    if not policy.skip_mri:
+        mri_dir = outputs["mri"].get("final_dir", "n/a") if "mri" in outputs else "n/a"
+        lines.append(f" - MRI final dir: {mri_dir}")
+    if not policy.skip_tdc:
+        tdc_session = (
+            outputs["tdc"].get("final_session", "n/a") if "tdc" in outputs else "n/a"
+        )
+        lines.append(f" - TDC final session: {tdc_session}")
+    lines.append(f" - Log file: {log_file}")
+    lines.append(f" - Manifest: {manifest_path}")
+    return lines
 
 
 def parse_and_resolve_config(
-    argv: Optional[List[str]] = None,
-) -> tuple[argparse.Namespace, Dict[str, Any], str, Dict[str, Any]]:
+    argv: list[str] | None = None,
+) -> tuple[argparse.Namespace, dict[str, Any], str, dict[str, Any]]:
     parser = argparse.ArgumentParser(description="PEDA mini-pipeline controller")
     parser.add_argument("--config", help="Path to YAML/JSON config file")
     parser.add_argument("--root", help="Root output folder")
@@ -142,7 +262,7 @@ def parse_and_resolve_config(
     parser.add_argument("--scratch", help="Scratch dir (default <root>/<case>/scratch)")
     parser.add_argument(
         "--scratch-policy",
-        choices=["local_temp", "case_root"],
+        choices=["local_temp", "case_root", "tmpfs"],
         help="Scratch location policy when --scratch is not set",
     )
     parser.add_argument("--log-dir", help="Directory for log files")
@@ -168,7 +288,17 @@ def parse_and_resolve_config(
     add_bool_arg(parser, "skip_mri", "Skip MRI step")
     add_bool_arg(parser, "skip_tdc", "Skip TDC step")
     add_bool_arg(parser, "dry_run", "Only validate and log planned actions")
-    add_bool_arg(parser, "hash_outputs", "Compute SHA-256 hashes for outputs")
+    add_bool_arg(parser, "hash_outputs", "Compute content hashes for outputs")
+    parser.add_argument(
+        "--hash-algo",
+        choices=["blake3", "blake2b", "sha256"],
+        help="Output hash algorithm (default sha256; blake3 falls back to blake2b if not installed)",
+    )
+    parser.add_argument(
+        "--hash-mode",
+        choices=["content", "metadata", "auto"],
+        help="Hash file contents, path/size/mtime only, or auto (metadata for session zips)",
+    )
     add_bool_arg(parser, "test_mode", "Fast test-mode (skip heavy steps)")
     add_bool_arg(
         parser, "allow_workspace_zips", "Allow zip archives under TDC workspace"
@@ -182,6 +312,12 @@ def parse_and_resolve_config(
     add_bool_arg(parser, "localdb_check_only", "Check local.db without anonymization")
     add_bool_arg(parser, "localdb_strict", "Fail pipeline on local.db findings")
     add_bool_arg(parser, "peda_enabled", "Enable PEDA step (stub by default)")
+    add_bool_arg(parser, "parallel_steps", "Run the MRI and TDC steps concurrently")
+    add_bool_arg(
+        parser,
+        "allow_hardlink_pdf",
+        "Hardlink the treatment report instead of copying when on the same filesystem",
+    )
     args = parser.parse_args(argv)
 
     if args.self_test:
@@ -204,6 +340,8 @@ def parse_and_resolve_config(
         "run_id": args.run_id,
         "dry_run": args.dry_run,
         "hash_outputs": args.hash_outputs,
+        "hash_algo": args.hash_algo,
+        "hash_mode": args.hash_mode,
         "test_mode": args.test_mode,
         "allow_workspace_zips": args.allow_workspace_zips,
         "legacy_filename_rules": args.legacy_filename_rules,
@@ -217,6 +355,8 @@ def parse_and_resolve_config(
         "peda_matlab_exe": args.peda_matlab_exe,
         "peda_root": args.peda_root,
         "peda_input_dir_mode": args.peda_input_dir_mode,
+        "parallel_steps": args.parallel_steps,
+        "allow_hardlink_pdf": args.allow_hardlink_pdf,
     }
 
     cfg, run_id = resolve_config(
@@ -224,10 +364,15 @@ def parse_and_resolve_config(
         cli_overrides=cli_overrides,
     )
     raw_paths = cfg.get("_raw_paths") if isinstance(cfg.get("_raw_paths"), dict) else {}
+    # Coerce the input paths once; everything downstream treats them as
+    # Path | None.
+    for key in ("mri_input", "tdc_input", "pdf_input"):
+        val = cfg.get(key)
+        cfg[key] = Path(val) if val and not isinstance(val, Path) else (val or None)
     return args, cfg, run_id, raw_paths
 
 
-def derive_run_context(cfg: Dict[str, Any]) -> Dict[str, Any]:
+def derive_run_context(cfg: dict[str, Any]) -> dict[str, Any]:
     root: Path = cfg["root"]
     case: str = cfg["case"]
     case_dir = cfg.get("case_dir") or (root / case)
@@ -252,15 +397,15 @@ def derive_run_context(cfg: Dict[str, Any]) -> Dict[str, Any]:
 def validate_inputs_and_prepare_dirs(
     *,
     logger: Any,
-    step_results: Dict[str, Any],
-    status_mgr: Optional[StatusManager],
-    cfg: Dict[str, Any],
-    raw_paths: Dict[str, Any],
-    run_ctx: Dict[str, Any],
-    inputs: Dict[str, Path],
+    step_results: dict[str, Any],
+    status_mgr: StatusManager | None,
+    cfg: dict[str, Any],
+    raw_paths: dict[str, Any],
+    run_ctx: dict[str, Any],
+    inputs: dict[str, Path],
     policy: RunPolicy,
-) -> Optional[Path]:
-    pdf_input_path: Optional[Path] = None
+) -> Path | None:
+    pdf_input_path: Path | None = None
 
     def _require_zip_input(
         cfg_key: str,
@@ -268,9 +413,9 @@ def validate_inputs_and_prepare_dirs(
         raw_key: str,
         missing_msg: str,
     ) -> None:
-        if not cfg[cfg_key]:
+        input_path: Path | None = cfg[cfg_key]
+        if input_path is None:
             raise ValidationError(missing_msg)
-        input_path = Path(cfg[cfg_key])
         _validate_zip(input_path, label, raw_paths.get(raw_key))
         inputs[cfg_key] = input_path
 
@@ -293,10 +438,12 @@ def validate_inputs_and_prepare_dirs(
         legacy_misc = case_dir / f"{case} Misc"
         legacy_mr = case_dir / f"{case} MR DICOM"
         legacy_tdc = case_dir / f"{case} TDC Sessions"
-        legacy_dirs = [legacy_misc, legacy_mr, legacy_tdc]
-        legacy_present = [p for p in legacy_dirs if p.exists()]
+        legacy_stats = {
+            p: _stat_or_none(p) for p in (legacy_misc, legacy_mr, legacy_tdc)
+        }
+        legacy_present = [p for p, st in legacy_stats.items() if st is not None]
         if legacy_present:
-            if all(p.exists() for p in (misc_dir, mr_dir, tdc_dir)):
+            if all(_stat_or_none(p) is not None for p in (misc_dir, mr_dir, tdc_dir)):
                 logger.warning(
                     "Legacy case-prefixed folders exist; using unprefixed schema. legacy=%s",
                     [str(p) for p in legacy_present],
@@ -309,10 +456,9 @@ def validate_inputs_and_prepare_dirs(
                     tdc_dir,
                 )
 
-        if not case_dir.exists() and policy.dry_run:
-            logger.warning("Case directory does not exist yet (dry-run): %s", case_dir)
         if policy.dry_run:
-            if not case_dir.exists():
+            if _stat_or_none(case_dir) is None:
+                logger.warning("Case directory does not exist yet (dry-run): %s", case_dir)
                 logger.info(
                     "Would create output folders under case_dir=%s (Misc=%s, MR DICOM=%s, TDC Sessions=%s)",
                     case_dir,
@@ -321,12 +467,16 @@ def validate_inputs_and_prepare_dirs(
                     case_dir / expected_tdc_name,
                 )
         else:
-            case_dir.mkdir(parents=True, exist_ok=True)
-            misc_dir.mkdir(parents=True, exist_ok=True)
-            mr_dir.mkdir(parents=True, exist_ok=True)
-            tdc_dir.mkdir(parents=True, exist_ok=True)
-            get_annon_logs_dir(case_dir)
-            run_ctx["log_dir"].mkdir(parents=True, exist_ok=True)
+            _make_dirs(
+                [
+                    case_dir,
+                    misc_dir,
+                    mr_dir,
+                    tdc_dir,
+                    case_dir / "annon_logs",
+                    run_ctx["log_dir"],
+                ]
+            )
             pre_removed = delete_forbidden_log_dirs(case_dir, logger=logger)
             if pre_removed:
                 logger.warning(
@@ -350,8 +500,8 @@ def validate_inputs_and_prepare_dirs(
                 "--tdc-input required (or set skip_tdc)",
             )
 
-        if cfg.get("pdf_input"):
-            pdf_input_path = Path(cfg["pdf_input"])
+        if cfg["pdf_input"] is not None:
+            pdf_input_path = cfg["pdf_input"]
             if pdf_input_path.exists() and pdf_input_path.is_file():
                 inputs["pdf_input"] = pdf_input_path
             else:
@@ -369,23 +519,131 @@ def validate_inputs_and_prepare_dirs(
 def run_pipeline(
     *,
     logger: Any,
-    step_results: Dict[str, Any],
-    status_mgr: Optional[StatusManager],
-    run_ctx: Dict[str, Any],
-    inputs: Dict[str, Path],
-    pdf_input_path: Optional[Path],
-    artifacts: Dict[str, Any],
+    step_results: dict[str, Any],
+    status_mgr: StatusManager | None,
+    run_ctx: dict[str, Any],
+    inputs: dict[str, Path],
+    pdf_input_path: Path | None,
+    artifacts: dict[str, Any],
     policy: RunPolicy,
-    pipeline_cfg: Dict[str, Any],
+    pipeline_cfg: dict[str, Any],
 ) -> None:
     logger.info("Run plan ready (dry_run=%s).", policy.dry_run)
+    if policy.hash_outputs and resolve_hash_algo(policy.hash_algo) != policy.hash_algo:
+        logger.warning(
+            "hash_algo=%s is not available (package not installed); hashing with %s, "
+            "so manifest entries carry no sha256 key.",
+            policy.hash_algo,
+            resolve_hash_algo(policy.hash_algo),
+        )
+
+    # The treatment-report copy overlaps the local.db step, and with
+    # parallel_steps MRI overlaps TDC, so step_results writes from either side
+    # go through this lock.
+    results_lock = threading.Lock()
 
     def _record_skip(step_name: str, reason: str) -> None:
-        step_results[step_name] = {
-            "status": "SKIP",
-            "duration_s": 0.0,
-            "error": reason,
-        }
+        with results_lock:
+            step_results[step_name] = {
+                "status": "SKIP",
+                "duration_s": 0.0,
+                "error": reason,
+            }
+
+    def _check_localdb() -> None:
+        if pipeline_cfg.get("localdb", {}).get("enabled"):
+            db_path = pipeline_cfg.get("localdb", {}).get("path")
+            if db_path:
+                db_path = Path(db_path)
+            elif tdc_artifacts:
+                db_path = Path(tdc_artifacts["final_session"]) / "local.db"
+            else:
+                db_path = None
+
+            if db_path and db_path.exists():
+                with StepTimer(
+                    logger=logger,
+                    step_name="local.db check",
+                    results=step_results,
+                    status_mgr=status_mgr,
+                    lock=results_lock,
+                ):
+                    out_dir = get_annon_logs_dir(run_ctx["case_dir"])
+                    localdb_summary = run_localdb_step(
+                        db_path=db_path,
+                        case_id=run_ctx["case"],
+                        out_dir=out_dir,
+                        enable_anon=pipeline_cfg.get("localdb", {}).get("enabled", True),
+                        check_only=pipeline_cfg.get("localdb", {}).get("check_only", False),
+                        strict=pipeline_cfg.get("localdb", {}).get("strict", True),
+                    )
+                    artifacts["outputs"]["localdb"] = localdb_summary
+            else:
+                _record_skip("local.db check", "missing_db")
+                logger.warning("local.db missing; skipping localdb step: %s", db_path)
+        else:
+            _record_skip("local.db check", "disabled")
+
+    def _copy_treatment_report(step_status: StatusManager | None) -> Path | None:
+        """Copy the report into Misc/; returns the file this call wrote, if any."""
+        with StepTimer(
+            logger=logger,
+            step_name="Treatment report",
+            results=step_results,
+            status_mgr=step_status,
+            lock=results_lock,
+        ):
+            target_pdf = None
+            if pdf_input_path:
+                if policy.legacy_filename_rules:
+                    target_pdf = run_ctx["misc_dir"] / f"{run_ctx['case']}_TreatmentReport.pdf"
+                else:
+                    target_pdf = run_ctx["misc_dir"] / pdf_input_path.name
+            if policy.dry_run:
+                if pdf_input_path and target_pdf:
+                    logger.info(
+                        "Dry-run: would copy report %s -> %s", pdf_input_path, target_pdf
+                    )
+                else:
+                    logger.info("Dry-run: no treatment report configured.")
+            else:
+                if (
+                    pdf_input_path
+                    and target_pdf
+                    and pdf_input_path.exists()
+                    and target_pdf.exists()
+                    and os.path.samefile(pdf_input_path, target_pdf)
+                ):
+                    # The input already is the delivered report (or a hardlink
+                    # to it); rewriting it would only risk the sole copy.
+                    logger.info("Treatment report already in place: %s", target_pdf)
+                elif pdf_input_path and target_pdf and pdf_input_path.exists():
+                    # Written under a temp name and renamed over the target, so
+                    # an existing file there is replaced, never written through.
+                    tmp_pdf = target_pdf.with_name(f".{target_pdf.name}.{uuid.uuid4().hex}.tmp")
+                    hashed = None
+                    try:
+                        if pipeline_cfg.get("allow_hardlink_pdf"):
+                            linked = link_or_copy(pdf_input_path, tmp_pdf)
+                            logger.debug("Treatment report hardlinked: %s", linked)
+                        elif policy.hash_outputs and policy.hash_mode != "metadata":
+                            # Hash while copying so the manifest needn't re-read it.
+                            hashed = copy_file_hashed(pdf_input_path, tmp_pdf, policy.hash_algo)
+                        else:
+                            copy_file_buffered(pdf_input_path, tmp_pdf)
+                        os.replace(tmp_pdf, target_pdf)
+                    except BaseException:
+                        tmp_pdf.unlink(missing_ok=True)
+                        raise
+                    if hashed is not None:
+                        from src.manifest import record_digest
+
+                        record_digest(target_pdf, policy.hash_algo, *hashed)
+                    logger.info("Treatment report copied: %s", target_pdf)
+                    return target_pdf
+                elif pdf_input_path:
+                    logger.warning("Treatment report missing: %s", pdf_input_path)
+        return None
 
     if policy.dry_run:
         step_results["MRI"] = {"status": "SKIP", "duration_s": 0.0, "error": "dry-run"}
@@ -398,8 +656,8 @@ def run_pipeline(
         _record_skip("Cleanup artifacts", "dry-run")
         _record_skip("PEDA step", "dry-run")
     else:
-        mri_artifacts: Dict[str, Any] | None = None
-        tdc_artifacts: Dict[str, Any] | None = None
+        mri_artifacts: dict[str, Any] | None = None
+        tdc_artifacts: dict[str, Any] | None = None
 
         if pipeline_cfg.get("unzip_inputs"):
             with StepTimer(
@@ -419,11 +677,17 @@ def run_pipeline(
         else:
             _record_skip("Unzip inputs", "disabled")
 
-        if not policy.skip_mri:
+        def _run_mri(step_status: StatusManager | None) -> dict[str, Any]:
             with StepTimer(
-                logger=logger, step_name="MRI", results=step_results, status_mgr=status_mgr
+                logger=logger,
+                step_name="MRI",
+                results=step_results,
+                status_mgr=step_status,
+                lock=results_lock,
             ):
-                mri_artifacts = MRI_proc.run(
+                import MRI_proc
+
+                result = MRI_proc.run(
                     root=run_ctx["root"],
                     case=run_ctx["case"],
                     input_zip=inputs["mri_input"],
@@ -433,108 +697,136 @@ def run_pipeline(
                     dry_run=False,
                     legacy_names=policy.legacy_filename_rules,
                 )
-                artifacts["outputs"]["mri"] = mri_artifacts
-                _assert_exists(mri_artifacts["final_dir"], "MRI final dir")
-        else:
-            step_results["MRI"] = {
-                "status": "SKIP",
-                "duration_s": 0.0,
-                "error": "skip_mri",
-            }
-
-        if pipeline_cfg.get("dicom_anon", {}).get("enabled") and not policy.skip_mri:
-            with StepTimer(
-                logger=logger,
-                step_name="DICOM anonymization",
-                results=step_results,
-                status_mgr=status_mgr,
-            ):
-                rules = build_dicom_rules(run_ctx["case"])
-                mode = pipeline_cfg.get("dicom_anon", {}).get("mode", "stub")
-                if mode == "stub":
-                    dicom_summary = run_dicom_anon_stub(
-                        mri_artifacts["final_dir"] if mri_artifacts else run_ctx["mr_dir"],
-                        run_ctx["case"],
-                        rules,
-                    )
-                else:
-                    dicom_summary = {
-                        "status": "skipped",
-                        "reason": "mode_not_supported",
-                        "mode": mode,
-                    }
-                    logger.warning("DICOM anonymization mode not supported: %s", mode)
-                artifacts["outputs"]["dicom_anon"] = dicom_summary
-        else:
-            _record_skip(
-                "DICOM anonymization",
-                "disabled" if not policy.skip_mri else "skip_mri",
-            )
+                artifacts["outputs"]["mri"] = result
+                _assert_exists(result["final_dir"], "MRI final dir")
+            return result
 
-        if not policy.skip_tdc:
-            with StepTimer(
-                logger=logger, step_name="TDC", results=step_results, status_mgr=status_mgr
-            ):
-                tdc_artifacts = TDC_proc.run(
-                    root=run_ctx["root"],
-                    case=run_ctx["case"],
-                    input_zip=inputs["tdc_input"],
-                    tdc_dir=run_ctx["tdc_dir"],
-                    misc_dir=run_ctx["misc_dir"],
-                    scratch=run_ctx["scratch"],
-                    date_shift_days=policy.date_shift_days,
+        def _run_dicom_anon() -> None:
+            if pipeline_cfg.get("dicom_anon", {}).get("enabled") and not policy.skip_mri:
+                with StepTimer(
                     logger=logger,
-                    dry_run=False,
-                    test_mode=policy.test_mode,
-                    allow_workspace_zips=policy.allow_workspace_zips,
-                    legacy_filename_rules=policy.legacy_filename_rules,
-                    step_results=step_results,
+                    step_name="DICOM anonymization",
+                    results=step_results,
                     status_mgr=status_mgr,
+                    lock=results_lock,
+                ):
+                    rules = build_dicom_rules(run_ctx["case"])
+                    mode = pipeline_cfg.get("dicom_anon", {}).get("mode", "stub")
+                    if mode == "stub":
+                        dicom_summary = run_dicom_anon_stub(
+                            (
+                                mri_artifacts["final_dir"]
+                                if mri_artifacts
+                                else run_ctx["mr_dir"]
+                            ),
+                            run_ctx["case"],
+                            rules,
+                        )
+                    else:
+                        dicom_summary = {
+                            "status": "skipped",
+                            "reason": "mode_not_supported",
+                            "mode": mode,
+                        }
+                        logger.warning("DICOM anonymization mode not supported: %s", mode)
+                    artifacts["outputs"]["dicom_anon"] = dicom_summary
+            else:
+                _record_skip(
+                    "DICOM anonymization",
+                    "disabled" if not policy.skip_mri else "skip_mri",
                 )
-                artifacts["outputs"]["tdc"] = tdc_artifacts
-                _assert_exists(tdc_artifacts["final_session"], "TDC final session")
-                if tdc_artifacts.get("local_db"):
-                    _assert_exists(tdc_artifacts["local_db"], "TDC local.db")
-                for z in tdc_artifacts.get("session_zips", []):
-                    _assert_exists(Path(z), "TDC session zip")
-        else:
-            step_results["TDC"] = {
+
+        # MRI and TDC read different zips and write disjoint output dirs and
+        # scratch names, so with parallel_steps MRI runs on a worker thread
+        # while TDC runs here. DICOM anonymization waits for MRI either way.
+        run_parallel = (
+            pipeline_cfg.get("parallel_steps")
+            and not policy.skip_mri
+            and not policy.skip_tdc
+        )
+        mri_pool: ThreadPoolExecutor | None = None
+        mri_future = None
+        if policy.skip_mri:
+            step_results["MRI"] = {
                 "status": "SKIP",
                 "duration_s": 0.0,
-                "error": "skip_tdc",
+                "error": "skip_mri",
             }
+        elif run_parallel:
+            mri_pool = ThreadPoolExecutor(max_workers=1)
+            mri_future = mri_pool.submit(_run_mri, None)
+        else:
+            mri_artifacts = _run_mri(status_mgr)
 
-        if pipeline_cfg.get("localdb", {}).get("enabled"):
-            db_path = pipeline_cfg.get("localdb", {}).get("path")
-            if db_path:
-                db_path = Path(db_path)
-            elif tdc_artifacts:
-                db_path = Path(tdc_artifacts["final_session"]) / "local.db"
-            else:
-                db_path = None
+        if mri_future is None:
+            _run_dicom_anon()
 
-            if db_path and db_path.exists():
+        try:
+            if not policy.skip_tdc:
                 with StepTimer(
                     logger=logger,
-                    step_name="local.db check",
+                    step_name="TDC",
                     results=step_results,
                     status_mgr=status_mgr,
+                    lock=results_lock,
                 ):
-                    out_dir = get_annon_logs_dir(run_ctx["case_dir"])
-                    localdb_summary = run_localdb_step(
-                        db_path=db_path,
-                        case_id=run_ctx["case"],
-                        out_dir=out_dir,
-                        enable_anon=pipeline_cfg.get("localdb", {}).get("enabled", True),
-                        check_only=pipeline_cfg.get("localdb", {}).get("check_only", False),
-                        strict=pipeline_cfg.get("localdb", {}).get("strict", True),
+                    import TDC_proc
+
+                    tdc_artifacts = TDC_proc.run(
+                        root=run_ctx["root"],
+                        case=run_ctx["case"],
+                        input_zip=inputs["tdc_input"],
+                        tdc_dir=run_ctx["tdc_dir"],
+                        misc_dir=run_ctx["misc_dir"],
+                        scratch=run_ctx["scratch"],
+                        date_shift_days=policy.date_shift_days,
+                        logger=logger,
+                        dry_run=False,
+                        test_mode=policy.test_mode,
+                        allow_workspace_zips=policy.allow_workspace_zips,
+                        legacy_filename_rules=policy.legacy_filename_rules,
+                        step_results=step_results,
+                        status_mgr=status_mgr,
+                        prefer_rename=True,
+                        results_lock=results_lock,
+                    )
+                    artifacts["outputs"]["tdc"] = tdc_artifacts
+                    _assert_exists(tdc_artifacts["final_session"], "TDC final session")
+                    if tdc_artifacts.get("local_db"):
+                        _assert_exists(tdc_artifacts["local_db"], "TDC local.db")
+                    _assert_all_exist(
+                        [str(z) for z in tdc_artifacts.get("session_zips", [])],
+                        "TDC session zip",
                     )
-                    artifacts["outputs"]["localdb"] = localdb_summary
             else:
-                _record_skip("local.db check", "missing_db")
-                logger.warning("local.db missing; skipping localdb step: %s", db_path)
-        else:
-            _record_skip("local.db check", "disabled")
+                step_results["TDC"] = {
+                    "status": "SKIP",
+                    "duration_s": 0.0,
+                    "error": "skip_tdc",
+                }
+        finally:
+            if mri_pool is not None:
+                mri_pool.shutdown(wait=True)
+
+        if mri_future is not None:
+            mri_artifacts = mri_future.result()
+            _run_dicom_anon()
+
+        # The report copy touches only Misc/ and the source PDF, which the
+        # local.db check does not read, so the two overlap. It starts only once
+        # the processing steps have succeeded, and is taken back out if the
+        # check fails; PEDA reads the case root, so it is joined before that.
+        with ThreadPoolExecutor(max_workers=1) as report_pool:
+            report_future = report_pool.submit(_copy_treatment_report, None)
+            try:
+                _check_localdb()
+            except BaseException:
+                written = None if report_future.exception() else report_future.result()
+                if written is not None:
+                    written.unlink(missing_ok=True)
+                    logger.info("Treatment report removed after failed local.db check: %s", written)
+                raise
+        report_future.result()
 
         if not policy.skip_tdc:
             with StepTimer(
@@ -612,32 +904,8 @@ def run_pipeline(
             }
             assert_no_forbidden_log_dirs(run_ctx["case_dir"])
 
-    with StepTimer(
-        logger=logger,
-        step_name="Treatment report",
-        results=step_results,
-        status_mgr=status_mgr,
-    ):
-        target_pdf = None
-        if pdf_input_path:
-            if policy.legacy_filename_rules:
-                target_pdf = run_ctx["misc_dir"] / f"{run_ctx['case']}_TreatmentReport.pdf"
-            else:
-                target_pdf = run_ctx["misc_dir"] / pdf_input_path.name
-        if policy.dry_run:
-            if pdf_input_path and target_pdf:
-                logger.info(
-                    "Dry-run: would copy report %s -> %s", pdf_input_path, target_pdf
-                )
-            else:
-                logger.info("Dry-run: no treatment report configured.")
-        else:
-            if pdf_input_path and target_pdf and pdf_input_path.exists():
-                target_pdf.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(pdf_input_path, target_pdf)
-                logger.info("Treatment report copied: %s", target_pdf)
-            elif pdf_input_path:
-                logger.warning("Treatment report missing: %s", pdf_input_path)
+    if policy.dry_run:
+        _copy_treatment_report(status_mgr)
 
     with StepTimer(
         logger=logger, step_name="structure_guard", results=step_results, status_mgr=status_mgr
@@ -655,10 +923,10 @@ def run_pipeline(
         if policy.legacy_filename_rules:
             pdf_expected = run_ctx["misc_dir"] / f"{run_ctx['case']}_TreatmentReport.pdf"
             if not pdf_expected.exists():
-                pdf_candidates = [
-                    p for p in run_ctx["case_dir"].rglob("*.pdf") if p != pdf_expected
-                ]
-                if not pdf_candidates:
+                stray_pdf = _find_stray_pdf(
+                    [run_ctx["misc_dir"], run_ctx["case_dir"]], pdf_expected
+                )
+                if stray_pdf is None:
                     logger.warning(
                         "Treatment report missing; expected %s",
                         pdf_expected,
@@ -678,9 +946,11 @@ def run_pipeline(
                 dry_run=True,
             )
             if initial_errs:
-                logger.info("Dry-run: structure_guard would fail with:")
-                for e in initial_errs:
-                    logger.info(" - %s", e)
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(
+                        "Dry-run: structure_guard would fail with:\n%s",
+                        "\n".join(f" - {e}" for e in initial_errs),
+                    )
             else:
                 logger.info("Dry-run: structure_guard would validate/fix layout.")
         else:
@@ -695,13 +965,16 @@ def run_pipeline(
                 allowed_top_dirs=allowed_top_dirs,
                 forbidden_top_files=forbidden_top_files,
             )
-            if initial_errs:
-                logger.info("structure_guard detected layout issues.")
-                for e in initial_errs:
-                    logger.info(" - %s", e)
-            if changes:
-                for c in changes:
-                    logger.info(" - %s", c)
+            if initial_errs and logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "structure_guard detected layout issues:\n%s",
+                    "\n".join(f" - {e}" for e in initial_errs),
+                )
+            if changes and logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "structure_guard changes:\n%s",
+                    "\n".join(f" - {c}" for c in changes),
+                )
             if final_errs:
                 raise ProcessingError(f"structure_guard failed: {final_errs}")
 
@@ -709,43 +982,72 @@ def run_pipeline(
         logger=logger, step_name="Finalization", results=step_results, status_mgr=status_mgr
     ):
         if policy.clean_scratch and not policy.dry_run:
-            shutil.rmtree(run_ctx["scratch"], ignore_errors=True)
-            logger.info("Scratch deleted: %s", run_ctx["scratch"])
+            scratch = Path(run_ctx["scratch"]).resolve()
+            if scratch.parent.is_relative_to(Path(run_ctx["case_dir"]).resolve()):
+                # A renamed-aside scratch would sit in the delivered case as a
+                # new top-level folder until the background delete finished.
+                fast_rmtree(scratch)
+                trash = None
+            else:
+                trash = discard_tree(scratch, logger=logger)
+            if trash is None:
+                logger.info("Scratch deleted: %s", run_ctx["scratch"])
+            else:
+                logger.info("Scratch moved to %s; deleting in background", trash)
 
 
 def finalize_and_write_manifest(
     *,
     logger: Any,
-    cfg: Dict[str, Any],
-    run_flags: Dict[str, Any],
+    cfg: dict[str, Any],
+    run_flags: dict[str, Any],
     run_id: str,
-    run_ctx: Dict[str, Any],
+    run_ctx: dict[str, Any],
     manifest_path: Path,
     log_file: Path,
-    planned_actions: List[str],
-    step_results: Dict[str, Any],
-    inputs: Dict[str, Path],
-    artifacts: Dict[str, Any],
+    planned_actions: list[PlanEntry],
+    step_results: dict[str, Any],
+    inputs: dict[str, Path],
+    artifacts: dict[str, Any],
     status: str,
     policy: RunPolicy,
+    plan_elided: bool = False,
 ) -> None:
+    from src.manifest import hash_cache_path, load_hash_cache, save_hash_cache
+    from src.reporting.manifest import (
+        build_manifest_payload,
+        file_metadata,
+        file_metadata_many,
+        write_manifest,
+    )
+
+    # Settle the log file once so its recorded size/mtime match the disk.
+    flush_log_file(logger)
+
     config_for_manifest = dict(cfg)
     config_for_manifest["run"] = {"flags": run_flags}
-    backups: Dict[str, Any] = {}
-    outputs_meta: Dict[str, Any] = {}
+    backups: dict[str, Any] = {}
+    outputs_meta: dict[str, Any] = {}
 
     pdf_output = None
-    if cfg.get("pdf_input"):
+    if cfg["pdf_input"] is not None:
         pdf_name = (
             f"{run_ctx['case']}_TreatmentReport.pdf"
             if policy.legacy_filename_rules
-            else Path(cfg["pdf_input"]).name
+            else cfg["pdf_input"].name
         )
         pdf_output = run_ctx["misc_dir"] / pdf_name
-    if pdf_output and pdf_output.exists():
-        outputs_meta["treatment_report"] = file_metadata(
-            pdf_output, compute_hash=policy.hash_outputs
-        )
+    # auto: session zips were already content-checked inside the TDC step,
+    # so they get a metadata fingerprint; everything else is hashed in full.
+    content_mode = "metadata" if policy.hash_mode == "metadata" else "content"
+    session_mode = "content" if policy.hash_mode == "content" else "metadata"
+
+    # Hashed outputs are collected first and hashed together below; the
+    # placeholders keep the manifest key order unchanged.
+    hashed: list[tuple[Any, Any, Path, str]] = []
+    if pdf_output and not policy.dry_run and pdf_output.exists():
+        outputs_meta["treatment_report"] = None
+        hashed.append((outputs_meta, "treatment_report", pdf_output, content_mode))
 
     if "mri" in artifacts.get("outputs", {}):
         mri_out = artifacts["outputs"]["mri"]
@@ -763,14 +1065,41 @@ def finalize_and_write_manifest(
         if tdc_out.get("backup_info"):
             backups["tdc_backup"] = tdc_out["backup_info"]
         if tdc_out.get("local_db"):
-            outputs_meta["tdc_local_db"] = file_metadata(
-                tdc_out["local_db"], compute_hash=policy.hash_outputs
+            outputs_meta["tdc_local_db"] = None
+            hashed.append(
+                (outputs_meta, "tdc_local_db", Path(tdc_out["local_db"]), content_mode)
             )
         if tdc_out.get("session_zips"):
-            outputs_meta["tdc_session_zips"] = [
-                file_metadata(Path(p), compute_hash=policy.hash_outputs)
-                for p in tdc_out["session_zips"]
-            ]
+            session_metas: list[Any] = [None] * len(tdc_out["session_zips"])
+            outputs_meta["tdc_session_zips"] = session_metas
+            hashed.extend(
+                (session_metas, idx, Path(p), session_mode)
+                for idx, p in enumerate(tdc_out["session_zips"])
+            )
+
+    # Content digests from earlier runs on this case are reused for outputs
+    # whose size and mtime have not changed since. The sidecar lives in the
+    # user's cache dir so nothing extra is delivered with the case.
+    case_dir = run_ctx["case_dir"]
+    hash_cache = hash_cache_path(case_dir)
+    use_hash_cache = policy.hash_outputs and not policy.dry_run and bool(hashed)
+    if use_hash_cache:
+        load_hash_cache(hash_cache, case_dir)
+    for mode in dict.fromkeys((content_mode, session_mode)):
+        jobs = [job for job in hashed if job[3] == mode]
+        metas = file_metadata_many(
+            [path for _, _, path, _ in jobs],
+            compute_hash=policy.hash_outputs,
+            hash_algo=policy.hash_algo,
+            hash_mode=mode,
+        )
+        for (container, key, _, _), meta in zip(jobs, metas):
+            container[key] = meta
+    if use_hash_cache:
+        try:
+            save_hash_cache(hash_cache, case_dir)
+        except OSError as exc:
+            logger.warning("Could not update hash cache %s: %s", hash_cache, exc)
 
     manifest_payload = build_manifest_payload(
         cfg_for_manifest=config_for_manifest,
@@ -779,13 +1108,16 @@ def finalize_and_write_manifest(
         status=status,
         test_mode=policy.test_mode,
         log_file=log_file,
-        planned_actions=planned_actions,
+        planned_actions=_render_plan(planned_actions),
+        plan_elided=plan_elided,
         step_results=step_results,
         inputs=inputs,
         backups=backups,
         outputs_meta=outputs_meta,
         hash_outputs=policy.hash_outputs,
         dry_run=policy.dry_run,
+        hash_algo=policy.hash_algo,
+        hash_mode=content_mode,
     )
 
     try:
@@ -802,6 +1134,8 @@ def main() -> int:
         return exc.code
 
     if args.self_test:
+        from src.selftest.runner import run_self_test
+
         return run_self_test(keep_temp=args.keep_temp)
 
     policy = policy_from_args_and_cfg(args, cfg)
@@ -810,6 +1144,8 @@ def main() -> int:
         "allow_workspace_zips": policy.allow_workspace_zips,
         "legacy_filename_rules": policy.legacy_filename_rules,
         "unzip_inputs": cfg.get("unzip_inputs"),
+        "parallel_steps": cfg.get("parallel_steps"),
+        "allow_hardlink_pdf": cfg.get("allow_hardlink_pdf"),
         "cleanup_enabled": cfg.get("cleanup_enabled"),
         "cleanup_dry_run": cfg.get("cleanup_dry_run"),
         "dicom_anon_enabled": cfg.get("dicom_anon_enabled"),
@@ -824,6 +1160,8 @@ def main() -> int:
     run_ctx = derive_run_context(cfg)
     pipeline_cfg = {
         "unzip_inputs": cfg.get("unzip_inputs"),
+        "parallel_steps": cfg.get("parallel_steps"),
+        "allow_hardlink_pdf": cfg.get("allow_hardlink_pdf"),
         "cleanup": {
             "enabled": cfg.get("cleanup_enabled"),
             "dry_run": cfg.get("cleanup_dry_run"),
@@ -854,6 +1192,9 @@ def main() -> int:
         run_id=run_id,
         log_dir=run_ctx["log_dir"],
         log_level=run_ctx["log_level"],
+        # Dry runs (CI validation loops) skip the Rich import and, with it,
+        # the live status display.
+        use_rich=not policy.dry_run,
     )
     logger.info("Run start case=%s run_id=%s", run_ctx["case"], run_id)
     logger.info("Test mode: %s", policy.test_mode)
@@ -866,32 +1207,45 @@ def main() -> int:
     )
 
     manifest_path = run_manifest_path(run_ctx["case_dir"], run_ctx["case"], run_id)
-    step_results: Dict[str, Any] = {}
-    inputs: Dict[str, Path] = {}
-    artifacts: Dict[str, Any] = {"outputs": {}}
-    planned_actions = _build_plan(
-        case_dir=run_ctx["case_dir"],
-        misc_dir=run_ctx["misc_dir"],
-        scratch=run_ctx["scratch"],
-        mr_dir=run_ctx["mr_dir"],
-        tdc_dir=run_ctx["tdc_dir"],
-        log_dir=run_ctx["log_dir"],
-        manifest_path=manifest_path,
-        run_id=run_id,
-        case=run_ctx["case"],
-        mri_input=Path(cfg["mri_input"]) if cfg["mri_input"] else None,
-        tdc_input=Path(cfg["tdc_input"]) if cfg["tdc_input"] else None,
-        pdf_input=Path(cfg["pdf_input"]) if cfg.get("pdf_input") else None,
-        skip_mri=policy.skip_mri,
-        skip_tdc=policy.skip_tdc,
-        test_mode=policy.test_mode,
-        allow_workspace_zips=policy.allow_workspace_zips,
-        clean_scratch=policy.clean_scratch,
-        legacy_names=policy.legacy_filename_rules,
+    step_results: dict[str, Any] = {}
+    inputs: dict[str, Path] = {}
+    artifacts: dict[str, Any] = {"outputs": {}}
+    # The plan only feeds the manifest; the root logger always runs at DEBUG
+    # for the file handler, so gate on the configured console level instead.
+    plan_elided = (
+        not policy.dry_run and _console_level(run_ctx["log_level"]) > logging.INFO
     )
+    planned_actions: list[PlanEntry] = []
+    if not plan_elided:
+        planned_actions = _build_plan(
+            case_dir=run_ctx["case_dir"],
+            misc_dir=run_ctx["misc_dir"],
+            scratch=run_ctx["scratch"],
+            mr_dir=run_ctx["mr_dir"],
+            tdc_dir=run_ctx["tdc_dir"],
+            log_dir=run_ctx["log_dir"],
+            manifest_path=manifest_path,
+            run_id=run_id,
+            case=run_ctx["case"],
+            mri_input=cfg["mri_input"],
+            tdc_input=cfg["tdc_input"],
+            pdf_input=cfg["pdf_input"],
+            skip_mri=policy.skip_mri,
+            skip_tdc=policy.skip_tdc,
+            test_mode=policy.test_mode,
+            allow_workspace_zips=policy.allow_workspace_zips,
+            clean_scratch=policy.clean_scratch,
+            legacy_names=policy.legacy_filename_rules,
+        )
+        if policy.dry_run:
+            logger.info(
+                "Planned actions:\n - %s", "\n - ".join(_render_plan(planned_actions))
+            )
 
-    status_mgr = StatusManager() if rich_available else None
-    pdf_input_path: Optional[Path] = None
+    # Rich live status only renders on an interactive terminal; skip it for
+    # piped/CI runs so no live-render thread is started.
+    status_mgr = StatusManager() if rich_available and sys.stdout.isatty() else None
+    pdf_input_path: Path | None = None
 
     try:
         if status_mgr:
@@ -945,6 +1299,7 @@ def main() -> int:
             manifest_path=manifest_path,
             log_file=log_file,
             planned_actions=planned_actions,
+            plan_elided=plan_elided,
             step_results=step_results,
             inputs=inputs,
             artifacts=artifacts,
@@ -952,20 +1307,14 @@ def main() -> int:
             policy=policy,
         )
 
-        logger.info("Run complete: %s", status)
-        logger.info("Artifacts:")
-        if not policy.skip_mri:
-            logger.info(
-                " - MRI final dir: %s",
-                artifacts.get("outputs", {}).get("mri", {}).get("final_dir", "n/a"),
-            )
-        if not policy.skip_tdc:
+        if logger.isEnabledFor(logging.INFO):
             logger.info(
-                " - TDC final session: %s",
-                artifacts.get("outputs", {}).get("tdc", {}).get("final_session", "n/a"),
+                "Run complete: %s\nArtifacts:\n%s",
+                status,
+                "\n".join(
+                    _artifact_lines(artifacts, policy, log_file, manifest_path)
+                ),
             )
-        logger.info(" - Log file: %s", log_file)
-        logger.info(" - Manifest: %s", manifest_path)
 
         sys.stdout.write(f"{status} case={run_ctx['case']} run_id={run_id}\n")
 
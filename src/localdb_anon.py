@@ -8,7 +8,7 @@ localdb_anon.py  (v1.0.2)
 Deterministic, in-place anonymization for a TDC Sessions/local.db
 
 - Edits the DB IN PLACE.
-- Optionally makes a temp copy (outside case dir) for proof.
+- Optionally keeps a pre-anonymization copy at a caller-chosen path.
 - Can be run standalone or imported.
 
 Usage (standalone):
@@ -18,7 +18,9 @@ Usage (standalone):
 """
 
 from __future__ import annotations
-import argparse, sqlite3, tempfile, shutil, json, re, hashlib, datetime, logging, sys
+import argparse, sqlite3, shutil, json, re, hashlib, datetime, logging, sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 _SALT = "pedaprocanon-2025-09-30"
@@ -47,15 +49,30 @@ _PATTERNS = [
     (r'.*date.*', "date_shift"),
     (r'.*time.*', "datetime_shift"),
 ]
+_COMPILED = [(re.compile(pat), kind) for pat, kind in _PATTERNS]
+_BATCH_ROWS = 10000
 
-def _sha(s: str) -> str: return hashlib.sha256(s.encode("utf-8")).hexdigest()
+# sha256 state after absorbing the salt; copying it skips re-hashing the prefix.
+_BASE = hashlib.sha256(_SALT.encode("utf-8"))
+
+def _salted(v) -> str:
+    h = _BASE.copy(); h.update(str(v).encode("utf-8")); return h.hexdigest()
 def _quote(name: str) -> str: return '"' + name.replace('"','""') + '"'
 
+@lru_cache(maxsize=256)
+def _build_upd(table: str, set_cols: tuple, where_cols: tuple) -> str:
+    set_sql = ", ".join(f"{_quote(c)}=?" for c in set_cols)
+    where = " AND ".join(f"{_quote(c)}=?" for c in where_cols)
+    return f"UPDATE {_quote(table)} SET {set_sql} WHERE {where}"
+
+# typed=True: 1, 1.0 and True hash alike but stringify differently.
+@lru_cache(maxsize=65536, typed=True)
 def _numhash(v, digits=8):
-    h = _sha(_SALT + str(v)); n = int(h[:16], 16)
+    h = _salted(v); n = int(h[:16], 16)
     return str(n % (10**digits)).zfill(digits)
 
-def _alnhash(v, length=12): return _sha(_SALT + str(v))[:length]
+@lru_cache(maxsize=65536, typed=True)
+def _alnhash(v, length=12): return _salted(v)[:length]
 def _first(v): return f"FN_{_alnhash(v,6).upper()}"
 def _last(v):  return f"LN_{_alnhash(v,6).upper()}"
 def _full(v):  return f"Person_{_alnhash(v,8).upper()}"
@@ -68,7 +85,11 @@ def _zip(v):   return _numhash(v,5)
 
 def _parsedt(s):
     if s is None or isinstance(s,(int,float)): return None
-    s = str(s).strip()
+    return _parsedt_str(str(s).strip())
+
+# Session timestamps repeat across rows and tables; parse each string once.
+@lru_cache(maxsize=1 << 16)
+def _parsedt_str(s: str):
     if not s: return None
     for f in ("%Y-%m-%d","%Y/%m/%d","%m/%d/%Y","%d/%m/%Y",
               "%Y-%m-%d %H:%M:%S","%Y/%m/%d %H:%M:%S","%m/%d/%Y %H:%M",
@@ -89,8 +110,8 @@ def _dob(s):
 
 def _classify(col: str):
     c = col.lower().strip()
-    for pat, kind in _PATTERNS:
-        if re.match(pat, c): return kind
+    for pat, kind in _COMPILED:
+        if pat.match(c): return kind
     return None
 
 def _find_local_db(case_dir: Path, norm_id: str) -> Path | None:
@@ -108,86 +129,129 @@ def _find_local_db(case_dir: Path, norm_id: str) -> Path | None:
 def anonymize_in_place(
     db_path: Path,
     date_shift_days: int = 137,
-    make_temp_proof: bool = True,
+    proof_copy: Path | None = None,
     logger: logging.Logger | None = None,
 ) -> dict:
     log = logger or logging.getLogger(__name__)
-    if make_temp_proof:
-        with tempfile.TemporaryDirectory() as td:
-            shutil.copy2(db_path, Path(td) / "local.db.backup")
-        log.debug("Temporary proof copy created for %s", db_path)
-    con = sqlite3.connect(db_path); con.row_factory = sqlite3.Row
-    cur = con.cursor(); cur.execute("PRAGMA foreign_keys=OFF")
-
-    TRANS = {
-        "id_hash_numeric": lambda v: None if v is None else _numhash(v, digits=min(12, max(6, len(str(v)) if isinstance(v, str) else 8))),
-        "id_hash_alnum":   lambda v: None if v is None else _alnhash(v, length=12),
-        "id_passthrough":  lambda v: v,
-        "first_name":      lambda v: None if v is None else _first(v),
-        "last_name":       lambda v: None if v is None else _last(v),
-        "full_name":       lambda v: None if v is None else _full(v),
-        "email":           lambda v: None if v is None else _email(v),
-        "phone":           lambda v: None if v is None else _phone(v),
-        "address":         lambda v: None if v is None else _addr(v),
-        "city":            lambda v: None if v is None else _city(v),
-        "state":           lambda v: None if v is None else _state(v),
-        "zip":             lambda v: None if v is None else _zip(v),
-        "dob":             lambda v: None if v is None else _dob(v),
-        "lat":             lambda v: None,
-        "lon":             lambda v: None,
-        "redact":          lambda v: None if v is None else "[REDACTED]",
-        "date_shift":      lambda v: None if v is None else _shift(v, date_shift_days, False),
-        "datetime_shift":  lambda v: None if v is None else _shift(v, date_shift_days, True),
-    }
-
-    cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")
-    tables = [r[0] for r in cur.fetchall()]
-    summary = {"db": str(db_path), "tables": [], "columns": {}}
-
-    for t in tables:
-        cur.execute(f"PRAGMA table_info({_quote(t)})")
-        info = cur.fetchall()
-        cols = [r["name"] for r in info]
-        pks  = [r["name"] for r in info if r["pk"]]
-        kinds = {c: _classify(c) for c in cols}
-        summary["columns"][t] = kinds
-
-        has_rowid = True
+    if proof_copy is not None:
+        shutil.copy2(db_path, proof_copy)
+        log.debug("Proof copy of %s written to %s", db_path, proof_copy)
+    con = sqlite3.connect(db_path)
+    # One worker builds the next batch's parameters while this thread runs the
+    # previous executemany (sqlite3 drops the GIL while stepping); the
+    # connection itself is only ever touched from this thread.
+    pool = ThreadPoolExecutor(max_workers=1)
+    try:
+        cur = con.cursor(); cur.execute("PRAGMA foreign_keys=OFF")
+        # WAL would persist in the delivered file's header, so only relax syncing.
+        # Temp tables (the per-table snapshots below) go to a temp file, so a
+        # large table's snapshot pages out beyond the page cache.
+        cur.execute("PRAGMA synchronous=NORMAL")
+        cur.execute("PRAGMA temp_store=FILE")
+        # 64 MiB page cache; memory-mapped reads where the platform allows it.
+        cur.execute("PRAGMA cache_size=-65536")
         try:
-            cur.execute(f"SELECT rowid AS __rid__, * FROM {_quote(t)}")
-            rows = cur.fetchall()
-        except sqlite3.OperationalError:
-            has_rowid = False
-            cur.execute(f"SELECT * FROM {_quote(t)}")
-            rows = cur.fetchall()
-
-        updated = 0
-        if rows:
-            if has_rowid:
-                set_cols = [c for c in cols if kinds[c] and kinds[c] in TRANS]
-                if set_cols:
-                    set_sql = ", ".join([f"{_quote(c)}=?" for c in set_cols])
-                    upd = f"UPDATE {_quote(t)} SET {set_sql} WHERE rowid=?"
-                    for r in rows:
-                        vals = [TRANS[kinds[c]](r[c]) for c in set_cols]
-                        cur.execute(upd, (*vals, r["__rid__"])); updated += 1
-            else:
-                if pks:
-                    set_cols = [c for c in cols if c not in pks and kinds[c] and kinds[c] in TRANS]
-                    if set_cols:
-                        set_sql = ", ".join([f"{_quote(c)}=?" for c in set_cols])
-                        where = " AND ".join([f"{_quote(c)}=?" for c in pks])
-                        upd = f"UPDATE {_quote(t)} SET {set_sql} WHERE {where}"
-                        for r in rows:
-                            vals = [TRANS[kinds[c]](r[c]) for c in set_cols]
-                            keys = [r[c] for c in pks]
-                            cur.execute(upd, (*vals, *keys)); updated += 1
+            cur.execute("PRAGMA mmap_size=268435456")
+        except sqlite3.Error:
+            pass
 
-        con.commit()
-        cur.execute(f"SELECT COUNT(*) FROM {_quote(t)}"); n = cur.fetchone()[0]
-        summary["tables"].append({"table": t, "rows": n, "updated_rows": updated})
+        TRANS = {
+            "id_hash_numeric": lambda v: None if v is None else _numhash(v, digits=min(12, max(6, len(str(v)) if isinstance(v, str) else 8))),
+            "id_hash_alnum":   lambda v: None if v is None else _alnhash(v, length=12),
+            "id_passthrough":  lambda v: v,
+            "first_name":      lambda v: None if v is None else _first(v),
+            "last_name":       lambda v: None if v is None else _last(v),
+            "full_name":       lambda v: None if v is None else _full(v),
+            "email":           lambda v: None if v is None else _email(v),
+            "phone":           lambda v: None if v is None else _phone(v),
+            "address":         lambda v: None if v is None else _addr(v),
+            "city":            lambda v: None if v is None else _city(v),
+            "state":           lambda v: None if v is None else _state(v),
+            "zip":             lambda v: None if v is None else _zip(v),
+            "dob":             lambda v: None if v is None else _dob(v),
+            "lat":             lambda v: None,
+            "lon":             lambda v: None,
+            "redact":          lambda v: None if v is None else "[REDACTED]",
+            "date_shift":      lambda v: None if v is None else _shift(v, date_shift_days, False),
+            "datetime_shift":  lambda v: None if v is None else _shift(v, date_shift_days, True),
+        }
+
+        cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")
+        tables = [r[0] for r in cur.fetchall()]
+        summary = {"db": str(db_path), "tables": [], "columns": {}}
+
+        # Plain tuples with indices resolved once per table; no per-cell name lookup.
+        def _params(rows, fns, set_idx, key_idx):
+            return [(*[f(r[i]) for f, i in zip(fns, set_idx)], *[r[i] for i in key_idx]) for r in rows]
 
-    con.execute("PRAGMA foreign_keys=ON"); con.commit(); con.close()
+        for t in tables:
+            cur.execute(f"PRAGMA table_info({_quote(t)})")
+            info = cur.fetchall()
+            cols = [r[1] for r in info]
+            pks  = [r[1] for r in info if r[5]]
+            kinds = {c: _classify(c) for c in cols}
+            summary["columns"][t] = {c: k for c, k in kinds.items() if k}
+
+            set_cols = [c for c in cols if kinds[c] in TRANS]
+            if not set_cols:
+                # Nothing to rewrite: count rows without pulling them into Python.
+                cur.execute(f"SELECT COUNT(*) FROM {_quote(t)}"); n = cur.fetchone()[0]
+                summary["tables"].append({"table": t, "rows": n, "updated_rows": 0})
+                continue
+
+            # Snapshot the original values and keys into a temp table first: stepping
+            # a SELECT on `t` while updating `t` is undefined in SQLite (an index on a
+            # rewritten column can hand back already-updated rows). The snapshot is
+            # file-backed (temp_store=FILE) and streamed in batches on a separate
+            # cursor, so Python holds one batch at a time and SQLite no more than
+            # its page cache. Rewritten columns come first, then the keys for the WHERE.
+            try:
+                key_cols = ["rowid"]
+                sel = ", ".join(_quote(c) for c in set_cols)
+                cur.execute(f"CREATE TEMP TABLE _anon_src AS SELECT {sel}, rowid AS _anon_key FROM {_quote(t)}")
+            except sqlite3.OperationalError:
+                set_cols = [c for c in set_cols if c not in pks]
+                key_cols = pks
+                sel = ", ".join(_quote(c) for c in set_cols + pks)
+                cur.execute(f"CREATE TEMP TABLE _anon_src AS SELECT {sel} FROM {_quote(t)}")
+            rd = con.cursor()
+            rd.arraysize = _BATCH_ROWS
+            try:
+                rd.execute("SELECT * FROM temp._anon_src")
+                upd = _build_upd(t, tuple(set_cols), tuple(key_cols)) if key_cols and set_cols else None
+                fns = [TRANS[kinds[c]] for c in set_cols]
+                set_idx = range(len(set_cols))
+                key_idx = range(len(set_cols), len(set_cols) + len(key_cols))
+
+                n = updated = 0
+                pending = None
+                while True:
+                    rows = rd.fetchmany()
+                    n += len(rows)
+                    nxt = pool.submit(_params, rows, fns, set_idx, key_idx) if rows and upd else None
+                    if pending is not None:
+                        params = pending.result()
+                        cur.executemany(upd, params)
+                        updated += len(params)
+                    pending = nxt
+                    if not rows:
+                        break
+            finally:
+                rd.close()
+            cur.execute("DROP TABLE temp._anon_src")
+            summary["tables"].append({"table": t, "rows": n, "updated_rows": updated})
+
+        # One transaction for every table (sqlite3 opened it at the first UPDATE).
+        con.commit()
+        con.execute("PRAGMA foreign_keys=ON")
+        con.commit()
+    except BaseException:
+        # Leave the DB as it was rather than half-rewritten.
+        con.rollback()
+        raise
+    finally:
+        pool.shutdown()
+        con.close()
     return summary
 
 def main():
@@ -197,8 +261,9 @@ def main():
     g.add_argument("--db", help="Path to local.db")
     ap.add_argument("--norm-id", help="NNN_NN-NNN if using --case-dir")
     ap.add_argument("--date-shift-days", type=int, default=137)
-    ap.add_argument("--no-temp-proof", dest="no_temp_proof", action="store_true",
-                    help="Do not make a temp backup copy")
+    ap.add_argument("--proof-copy", help="Keep a copy of the DB as it was before anonymization")
+    # Accepted for old scripts; no throwaway copy is made any more.
+    ap.add_argument("--no-temp-proof", action="store_true", help=argparse.SUPPRESS)
     args = ap.parse_args()
 
     logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
@@ -217,7 +282,7 @@ def main():
     s = anonymize_in_place(
         db_path,
         args.date_shift_days,
-        make_temp_proof=(not args.no_temp_proof),
+        proof_copy=Path(args.proof_copy) if args.proof_copy else None,
         logger=log,
     )
     sys.stdout.write(json.dumps({"ok": True, "summary": s}, indent=2) + "\n")
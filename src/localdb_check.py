@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-"""
+r"""
 localdb_check.py
 
 Read-only checker for Profound/TDC local.db (SQLite).
@@ -27,8 +27,13 @@ import os
 import re
 import sqlite3
 import sys
-from dataclasses import dataclass, asdict
-from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
 
 
 # -----------------------------
@@ -39,7 +44,15 @@ def connect_sqlite(db_path: str) -> sqlite3.Connection:
     # URI read-only if possible
     if os.path.exists(db_path):
         uri = f"file:{db_path}?mode=ro"
-        return sqlite3.connect(uri, uri=True)
+        conn = sqlite3.connect(uri, uri=True)
+        try:
+            # Short-lived reader: larger page cache, sorts kept off disk.
+            conn.executescript(
+                "PRAGMA query_only=1; PRAGMA temp_store=MEMORY; PRAGMA cache_size=-20000;"
+            )
+        except sqlite3.Error:
+            pass
+        return conn
     # Fallback: will raise consistent error
     return sqlite3.connect(db_path)
 
@@ -51,13 +64,39 @@ def fetch_all(conn: sqlite3.Connection, sql: str, params: Tuple[Any, ...] = ())
     cur.close()
     return rows
 
+def fetch_values(conn: sqlite3.Connection, sql: str, params: Tuple[Any, ...] = ()) -> List[Any]:
+    # First column of each row as plain values; no sqlite3.Row per row.
+    cur = conn.cursor()
+    cur.row_factory = None
+    try:
+        return [r[0] for r in cur.execute(sql, params)]
+    finally:
+        cur.close()
+
 def list_tables(conn: sqlite3.Connection) -> List[str]:
-    rows = fetch_all(conn, "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name;")
-    return [r["name"] for r in rows]
+    return fetch_values(conn, "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name;")
 
 def list_columns(conn: sqlite3.Connection, table: str) -> List[str]:
-    rows = fetch_all(conn, f"PRAGMA table_info({quote_ident(table)});")
-    return [r["name"] for r in rows]
+    return fetch_values(conn, "SELECT name FROM pragma_table_info(?) ORDER BY cid;", (table,))
+
+def snapshot_schema(conn: sqlite3.Connection) -> Dict[str, List[str]]:
+    """
+    Table name -> column names for every user table (ordered by name), read
+    in one query. Falls back to list_tables/list_columns without JSON support.
+    """
+    sql = (
+        "SELECT m.name, (SELECT json_group_array(p.name) FROM pragma_table_info(m.name) p) "
+        "FROM sqlite_master m WHERE m.type='table' AND m.name NOT LIKE 'sqlite_%' ORDER BY m.name;"
+    )
+    cur = conn.cursor()
+    cur.row_factory = None
+    try:
+        rows = cur.execute(sql).fetchall()
+    except sqlite3.OperationalError:
+        return {t: list_columns(conn, t) for t in list_tables(conn)}
+    finally:
+        cur.close()
+    return {name: json.loads(cols) for name, cols in rows}
 
 def quote_ident(name: str) -> str:
     # SQLite identifier quoting
@@ -69,18 +108,63 @@ def safe_select_some(conn: sqlite3.Connection, table: str, columns: List[str], l
     return fetch_all(conn, sql)
 
 def safe_select_nonnull_distinct(conn: sqlite3.Connection, table: str, column: str, limit: int = 200) -> List[Any]:
-    sql = (
-        f"SELECT DISTINCT {quote_ident(column)} AS v "
-        f"FROM {quote_ident(table)} "
-        f"WHERE {quote_ident(column)} IS NOT NULL "
-        f"LIMIT {int(limit)};"
-    )
-    rows = fetch_all(conn, sql)
-    return [r["v"] for r in rows]
+    # Streamed and de-duplicated in Python (no DISTINCT temp b-tree); stops
+    # reading as soon as `limit` distinct values have been seen.
+    return scan_candidate_values(conn, table, [column], per_column=limit)[column]
+
+def scan_candidate_values(
+    conn: sqlite3.Connection,
+    table: str,
+    columns: List[str],
+    exclude: Optional[str] = None,
+    per_column: int = 200,
+    skip_placeholders: bool = False,
+) -> Dict[str, List[Any]]:
+    """
+    One pass over `table` returning, per column, up to `per_column` distinct
+    non-null values that differ from `exclude` (and, with skip_placeholders,
+    are not anonymization placeholders). SQLite only returns rows where at
+    least one column is a candidate; de-duplication happens here, and the
+    scan stops once every column has its quota.
+    """
+    placeholders = tuple(sorted(_PLACEHOLDERS)) if skip_placeholders else ()
+    conds: List[str] = []
+    params: List[Any] = []
+    for c in columns:
+        q = quote_ident(c)
+        cond = f"{q} IS NOT NULL"
+        if exclude is not None:
+            cond += f" AND {q} <> ?"
+            params.append(exclude)
+        if placeholders:
+            # ASCII lower/trim only ever drops values the Python check would.
+            cond += f" AND lower(trim({q})) NOT IN ({', '.join('?' * len(placeholders))})"
+            params.extend(placeholders)
+        conds.append(f"({cond})")
+    col_sql = ", ".join(quote_ident(c) for c in columns)
+    sql = f"SELECT {col_sql} FROM {quote_ident(table)} WHERE {' OR '.join(conds)};"
+    seen: List[Dict[Any, None]] = [{} for _ in columns]
+    cur = conn.cursor()
+    cur.row_factory = None
+    try:
+        for row in cur.execute(sql, params):
+            for i, v in enumerate(row):
+                if v is None or v == exclude or len(seen[i]) >= per_column:
+                    continue
+                # Rows matched through another column can still carry placeholders here.
+                if placeholders and isinstance(v, str) and v.strip().lower() in _PLACEHOLDERS:
+                    continue
+                seen[i].setdefault(v, None)
+            if all(len(vals) >= per_column for vals in seen):
+                break
+    finally:
+        cur.close()
+    return {c: list(vals) for c, vals in zip(columns, seen)}
 
 
-def audit_log_mentions_session_info(conn: sqlite3.Connection) -> bool:
-    tables = set(list_tables(conn))
+def audit_log_mentions_session_info(conn: sqlite3.Connection, tables: Optional[Set[str]] = None) -> bool:
+    if tables is None:
+        tables = set(list_tables(conn))
     if "AuditLogRecords" not in tables:
         return False
     cols = list_columns(conn, "AuditLogRecords")
@@ -98,14 +182,20 @@ def audit_log_mentions_session_info(conn: sqlite3.Connection) -> bool:
 # Finding model
 # -----------------------------
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Finding:
     severity: str          # "INFO" | "WARN" | "FAIL"
     category: str          # "SCHEMA" | "ANON" | "SUSPICIOUS"
     table: Optional[str]
     column: Optional[str]
     message: str
-    examples: Optional[List[str]] = None
+    examples: Tuple[str, ...] = ()
+
+_FINDING_FIELDS = tuple(f.name for f in fields(Finding))
+
+def _finding_dicts(findings: List[Finding]) -> List[Dict[str, Any]]:
+    # Shallow field copy; asdict() would deep-copy every examples tuple.
+    return [{name: getattr(f, name) for name in _FINDING_FIELDS} for f in findings]
 
 
 # -----------------------------
@@ -113,13 +203,24 @@ class Finding:
 # -----------------------------
 
 NAME_LIKE = re.compile(r"^[A-Z][a-z]+(?:[-'][A-Z][a-z]+)?$")          # "Smith", "O'Neil", "Anne-Marie"
-HAS_SPACE = re.compile(r"\s+")
-HAS_COMMA = re.compile(r",")
+HAS_SPACE_OR_COMMA = re.compile(r"[\s,]")
 ALNUM_LONG = re.compile(r"^[A-Za-z0-9]{8,}$")                        # long token-ish (IDs)
 DIGITS_LONG = re.compile(r"^\d{6,}$")                                # MRN-ish
 EMAIL_LIKE = re.compile(r".+@.+\..+")
 DATE_LIKE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
 
+_PLACEHOLDERS = frozenset({"anon", "anonymous", "redacted", "unknown", "patient"})
+
+# Checked in order; first hit wins. Bound methods skip the attribute lookups.
+_RULES = (
+    (EMAIL_LIKE.match, "email_like"),
+    (NAME_LIKE.match, "name_like_single_token"),
+    (HAS_SPACE_OR_COMMA.search, "contains_whitespace_or_comma"),
+    (DATE_LIKE.match, "date_like"),
+    (DIGITS_LONG.match, "long_numeric_id_like"),
+    (ALNUM_LONG.match, "long_alphanumeric_id_like"),
+)
+
 def is_suspicious_value(v: Any, expected: Optional[str]) -> Tuple[bool, str]:
     """
     Returns (suspicious?, reason).
@@ -127,29 +228,20 @@ def is_suspicious_value(v: Any, expected: Optional[str]) -> Tuple[bool, str]:
     """
     if v is None:
         return (False, "null")
-    s = str(v).strip()
+    s = v.strip() if isinstance(v, str) else str(v).strip()
     if s == "":
         return (False, "empty")
     if expected is not None and s == expected:
         return (False, "matches_expected")
 
     # Obvious not-PII tokens (common anonymization placeholders)
-    if s.lower() in {"anon", "anonymous", "redacted", "unknown", "patient"}:
+    if s.lower() in _PLACEHOLDERS:
         return (False, "placeholder")
 
     # Heuristics that suggest "real" content (not definitive)
-    if EMAIL_LIKE.match(s):
-        return (True, "email_like")
-    if NAME_LIKE.match(s):
-        return (True, "name_like_single_token")
-    if HAS_SPACE.search(s) or HAS_COMMA.search(s):
-        return (True, "contains_whitespace_or_comma")
-    if DATE_LIKE.match(s):
-        return (True, "date_like")
-    if DIGITS_LONG.match(s):
-        return (True, "long_numeric_id_like")
-    if ALNUM_LONG.match(s):
-        return (True, "long_alphanumeric_id_like")
+    for match_fn, reason in _RULES:
+        if match_fn(s):
+            return (True, reason)
 
     # Default: if not expected and non-empty, treat as mildly suspicious
     return (True, "nonempty_not_expected")
@@ -166,16 +258,24 @@ def find_matching_columns(columns: List[str], wanted: List[str]) -> List[str]:
     lower_map = {c.lower(): c for c in columns}
     hits = []
     for w in wanted:
-        if w.lower() in lower_map:
-            hits.append(lower_map[w.lower()])
+        c = lower_map.get(w.lower())
+        # Variants like PatientId/PatientID resolve to the same column once.
+        if c is not None and c not in hits:
+            hits.append(c)
     return hits
 
-def check_schema_reachability(conn: sqlite3.Connection, required_tables: List[str]) -> List[Finding]:
+def check_schema_reachability(
+    conn: sqlite3.Connection,
+    required_tables: List[str],
+    *,
+    tables: Optional[Set[str]] = None,
+) -> List[Finding]:
     findings: List[Finding] = []
-    tables = set(list_tables(conn))
+    if tables is None:
+        tables = set(list_tables(conn))
     for t in required_tables:
         if t not in tables:
-            if t == "SessionInformationChangeRecord" and audit_log_mentions_session_info(conn):
+            if t == "SessionInformationChangeRecord" and audit_log_mentions_session_info(conn, tables):
                 findings.append(Finding(
                     severity="WARN",
                     category="SCHEMA",
@@ -201,12 +301,19 @@ def check_schema_reachability(conn: sqlite3.Connection, required_tables: List[st
             ))
     return findings
 
-def check_sessioninfo_change_record(conn: sqlite3.Connection, case_id: str) -> List[Finding]:
+def check_sessioninfo_change_record(
+    conn: sqlite3.Connection,
+    case_id: str,
+    *,
+    tables: Optional[Set[str]] = None,
+    columns_by_table: Optional[Dict[str, List[str]]] = None,
+) -> List[Finding]:
     findings: List[Finding] = []
     table = "SessionInformationChangeRecord"
-    tables = set(list_tables(conn))
+    if tables is None:
+        tables = set(list_tables(conn))
     if table not in tables:
-        if audit_log_mentions_session_info(conn):
+        if audit_log_mentions_session_info(conn, tables):
             findings.append(Finding(
                 "WARN",
                 "SCHEMA",
@@ -224,7 +331,9 @@ def check_sessioninfo_change_record(conn: sqlite3.Connection, case_id: str) -> L
             ))
         return findings
 
-    cols = list_columns(conn, table)
+    cols = (columns_by_table or {}).get(table)
+    if cols is None:
+        cols = list_columns(conn, table)
 
     # Your target patterns, plus common variants/typos
     wanted = [
@@ -251,9 +360,10 @@ def check_sessioninfo_change_record(conn: sqlite3.Connection, case_id: str) -> L
         message=f"Matched columns: {', '.join(hits)}"
     ))
 
-    # For each hit column, look for distinct non-null values and flag those not equal to case-id
+    # Distinct non-null values per hit column (one scan), flagged if not equal to case-id
+    values = scan_candidate_values(conn, table, hits, exclude=case_id, skip_placeholders=True)
     for c in hits:
-        vals = safe_select_nonnull_distinct(conn, table, c, limit=200)
+        vals = values[c]
         bad_examples: List[str] = []
         reasons: Dict[str, int] = {}
         for v in vals:
@@ -270,7 +380,7 @@ def check_sessioninfo_change_record(conn: sqlite3.Connection, case_id: str) -> L
                 table=table,
                 column=c,
                 message=f"Non-null values found that do not match expected case-id '{case_id}'. Reasons: {reasons}",
-                examples=bad_examples
+                examples=tuple(bad_examples)
             ))
         else:
             findings.append(Finding(
@@ -283,15 +393,25 @@ def check_sessioninfo_change_record(conn: sqlite3.Connection, case_id: str) -> L
 
     return findings
 
-def check_sessions_table(conn: sqlite3.Connection, case_id: str, require_equal_caseid: bool = True) -> List[Finding]:
+def check_sessions_table(
+    conn: sqlite3.Connection,
+    case_id: str,
+    require_equal_caseid: bool = True,
+    *,
+    tables: Optional[Set[str]] = None,
+    columns_by_table: Optional[Dict[str, List[str]]] = None,
+) -> List[Finding]:
     findings: List[Finding] = []
     table = "Sessions"
-    tables = set(list_tables(conn))
+    if tables is None:
+        tables = set(list_tables(conn))
     if table not in tables:
         findings.append(Finding("FAIL", "SCHEMA", table, None, "Table not present; cannot check Sessions.FirstName/LastName"))
         return findings
 
-    cols = list_columns(conn, table)
+    cols = (columns_by_table or {}).get(table)
+    if cols is None:
+        cols = list_columns(conn, table)
     hits = find_matching_columns(cols, ["FirstName", "LastName"])
     if len(hits) < 2:
         findings.append(Finding(
@@ -303,20 +423,31 @@ def check_sessions_table(conn: sqlite3.Connection, case_id: str, require_equal_c
         ))
         return findings
 
-    # Pull distinct values
+    # Pull distinct values (one scan for both columns)
+    # Placeholders only count as clean when case-id equality is not enforced.
+    values = scan_candidate_values(
+        conn,
+        table,
+        hits,
+        exclude=case_id if require_equal_caseid else None,
+        skip_placeholders=not require_equal_caseid,
+    )
     for c in hits:
-        vals = safe_select_nonnull_distinct(conn, table, c, limit=200)
+        vals = values[c]
         bad_examples: List[str] = []
         reasons: Dict[str, int] = {}
         for v in vals:
-            expected = case_id if require_equal_caseid else None
-            suspicious, reason = is_suspicious_value(v, expected=expected)
-            # If require_equal_caseid=True, any non-null != case_id is suspicious by definition
-            if require_equal_caseid and str(v).strip() != case_id:
-                reasons["not_equal_case_id"] = reasons.get("not_equal_case_id", 0) + 1
-                if len(bad_examples) < 10:
-                    bad_examples.append(str(v))
-            elif (not require_equal_caseid) and suspicious:
+            if require_equal_caseid:
+                # Any non-null != case_id is suspicious by definition; the
+                # heuristics are not consulted in this mode.
+                s = v.strip() if isinstance(v, str) else str(v).strip()
+                if s != case_id:
+                    reasons["not_equal_case_id"] = reasons.get("not_equal_case_id", 0) + 1
+                    if len(bad_examples) < 10:
+                        bad_examples.append(str(v))
+                continue
+            suspicious, reason = is_suspicious_value(v, expected=None)
+            if suspicious:
                 reasons[reason] = reasons.get(reason, 0) + 1
                 if len(bad_examples) < 10:
                     bad_examples.append(str(v))
@@ -328,7 +459,7 @@ def check_sessions_table(conn: sqlite3.Connection, case_id: str, require_equal_c
                 table=table,
                 column=c,
                 message=f"Sessions.{c} contains values not matching expected '{case_id}'. Reasons: {reasons}",
-                examples=bad_examples
+                examples=tuple(bad_examples)
             ))
         else:
             findings.append(Finding(
@@ -364,25 +495,38 @@ def main() -> int:
         conn = connect_sqlite(args.db)
     except Exception as e:
         findings.append(Finding("FAIL", "SCHEMA", None, None, f"Cannot open database: {e}"))
-        report["findings"] = [asdict(f) for f in findings]
+        report["findings"] = _finding_dicts(findings)
         _emit(report, args.json_out)
         print("ERROR: cannot open database")
         return 3
 
     try:
-        tables = list_tables(conn)
+        # Schema is read once (one query) and shared by every check below.
+        columns_by_table = snapshot_schema(conn)
+        tables = list(columns_by_table)
         report["tables"] = tables
 
+        required = ["SessionInformationChangeRecord", "Sessions"]
+        table_set = set(tables)
+
         # Reachability checks (minimal, focused on your targets)
-        findings += check_schema_reachability(conn, ["SessionInformationChangeRecord", "Sessions"])
+        findings += check_schema_reachability(conn, required, tables=table_set)
 
         # Target checks
-        findings += check_sessioninfo_change_record(conn, args.case_id)
-        findings += check_sessions_table(conn, args.case_id, require_equal_caseid=not args.no_caseid_enforce_sessions)
+        findings += check_sessioninfo_change_record(
+            conn, args.case_id, tables=table_set, columns_by_table=columns_by_table
+        )
+        findings += check_sessions_table(
+            conn,
+            args.case_id,
+            require_equal_caseid=not args.no_caseid_enforce_sessions,
+            tables=table_set,
+            columns_by_table=columns_by_table,
+        )
 
     except Exception as e:
         findings.append(Finding("FAIL", "SCHEMA", None, None, f"Error while querying database: {e}"))
-        report["findings"] = [asdict(f) for f in findings]
+        report["findings"] = _finding_dicts(findings)
         _emit(report, args.json_out)
         print("ERROR: failed during query/inspection")
         return 3
@@ -392,7 +536,7 @@ def main() -> int:
         except Exception:
             pass
 
-    report["findings"] = [asdict(f) for f in findings]
+    report["findings"] = _finding_dicts(findings)
 
     # Summary + exit code
     n_fail = sum(1 for f in findings if f.severity == "FAIL")
@@ -411,9 +555,20 @@ def main() -> int:
     return 0
 
 def _emit(report: Dict[str, Any], json_out: Optional[str]) -> None:
-    if json_out:
-        with open(json_out, "w", encoding="utf-8") as f:
-            json.dump(report, f, indent=2)
+    if not json_out:
+        return
+    if orjson is not None:
+        try:
+            data = orjson.dumps(report, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            # orjson rejects some values stdlib accepts (e.g. >64-bit ints).
+            data = None
+        if data is not None:
+            with open(json_out, "wb") as f:
+                f.write(data)
+            return
+    with open(json_out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
 
 def _print_human(report: Dict[str, Any]) -> None:
     print("\n=== local.db CHECK REPORT ===")
@@ -433,10 +588,9 @@ def _print_human(report: Dict[str, Any]) -> None:
         if loc:
             loc = f" [{loc}]"
         print(f"{sev:<4} {cat:<10}{loc} {f['message']}")
-        ex = f.get("examples") or []
-        if ex:
+        if f["examples"]:
             print("     Examples:")
-            for e in ex:
+            for e in f["examples"]:
                 print(f"       - {e}")
 
     s = report.get("summary", {})
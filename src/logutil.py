@@ -4,13 +4,23 @@
 # NOTES: Uses Rich console logging when available.
 from __future__ import annotations
 
+import errno
 import hashlib
 import logging
+import mmap
+import os
 import shutil
-from logging.handlers import RotatingFileHandler
+import subprocess
+import sys
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from logging.handlers import MemoryHandler, RotatingFileHandler
 from pathlib import Path
 from time import monotonic
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 
 class PipelineError(Exception):
@@ -29,12 +39,28 @@ class UnexpectedError(PipelineError):
     code = 4
 
 
+@lru_cache(maxsize=None)
+def _rich_classes() -> Optional[Tuple[Any, Any, Any]]:
+    """(RichHandler, Console, Status) when rich is importable, else None.
+
+    Resolved once per process; a failed import is not retried on every call.
+    """
+    try:
+        from rich.console import Console  # type: ignore
+        from rich.logging import RichHandler  # type: ignore
+        from rich.status import Status  # type: ignore
+    except Exception:
+        return None
+    return RichHandler, Console, Status
+
+
 def init_logger(
     *,
     case: str,
     run_id: str,
     log_dir: Path,
     log_level: str = "INFO",
+    use_rich: bool = True,
 ) -> Tuple[logging.Logger, Path, bool]:
     log_dir.mkdir(parents=True, exist_ok=True)
     log_file = log_dir / f"{case}__{run_id}.log"
@@ -46,7 +72,10 @@ def init_logger(
 
     rich_available = False
     try:
-        from rich.logging import RichHandler  # type: ignore
+        rich = _rich_classes() if use_rich else None
+        if rich is None:
+            raise ImportError("rich disabled or not installed")
+        RichHandler = rich[0]
 
         console_handler = RichHandler(level=log_level, show_time=False, show_path=False)
         rich_available = True
@@ -66,12 +95,39 @@ def init_logger(
     if not isinstance(console_handler, logging.Handler) or console_handler.formatter is None:
         console_handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
 
+    # Buffer file records and write them in batches; WARNING and above (and
+    # shutdown/close) flush immediately so failures are never held back.
+    buffered_file_handler = MemoryHandler(
+        capacity=1024, flushLevel=logging.WARNING, target=file_handler
+    )
+    buffered_file_handler.setLevel(logging.DEBUG)
+
     logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    logger.addHandler(buffered_file_handler)
     logger.debug("Logger initialized for case=%s run_id=%s", case, run_id)
     return logger, log_file, rich_available
 
 
+def flush_log_file(logger: logging.Logger) -> None:
+    """
+    Push buffered records to the log file and fsync it, so its size and
+    mtime are settled before they are recorded in the manifest.
+    """
+    for handler in logger.handlers:
+        handler.flush()
+        file_handler = (
+            handler
+            if isinstance(handler, logging.FileHandler)
+            else getattr(handler, "target", None)
+        )
+        if isinstance(file_handler, logging.FileHandler) and file_handler.stream:
+            file_handler.flush()
+            try:
+                os.fsync(file_handler.stream.fileno())
+            except (OSError, ValueError):
+                pass
+
+
 class StepTimer:
     def __init__(
         self,
@@ -80,13 +136,22 @@ class StepTimer:
         step_name: str,
         results: Dict[str, Any],
         status_mgr: Optional["StatusManager"] = None,
+        lock: Optional[threading.Lock] = None,
     ):
         self.logger = logger
         self.step_name = step_name
         self.results = results
         self.status_mgr = status_mgr
+        self.lock = lock
         self.start = 0.0
 
+    def _record(self, entry: Dict[str, Any]) -> None:
+        if self.lock is None:
+            self.results[self.step_name] = entry
+            return
+        with self.lock:
+            self.results[self.step_name] = entry
+
     def __enter__(self):
         self.start = monotonic()
         self.logger.info("START %s", self.step_name)
@@ -98,18 +163,14 @@ class StepTimer:
         duration = monotonic() - self.start
         if exc is None:
             self.logger.info("PASS  %s (%.2fs)", self.step_name, duration)
-            self.results[self.step_name] = {
-                "status": "PASS",
-                "duration_s": round(duration, 2),
-                "error": None,
-            }
+            self._record(
+                {"status": "PASS", "duration_s": round(duration, 2), "error": None}
+            )
             return False
         self.logger.error("FAIL  %s (%.2fs) %s", self.step_name, duration, exc)
-        self.results[self.step_name] = {
-            "status": "FAIL",
-            "duration_s": round(duration, 2),
-            "error": str(exc),
-        }
+        self._record(
+            {"status": "FAIL", "duration_s": round(duration, 2), "error": str(exc)}
+        )
         return False
 
 
@@ -118,10 +179,12 @@ class StatusManager:
         self._status = None
 
     def __enter__(self):
+        rich = _rich_classes()
+        if rich is None:
+            self._status = None
+            return self
+        _, Console, Status = rich
         try:
-            from rich.console import Console  # type: ignore
-            from rich.status import Status  # type: ignore
-
             console = Console()
             self._status = Status("", console=console)
             self._status.__enter__()
@@ -139,14 +202,360 @@ class StatusManager:
         self._status = None
 
 
+_HASH_SLICE = 16 * 1024 * 1024
+_MMAP_MIN = 10 * 1024 * 1024
+
+
+def _hash_small_into(h: Any, fd: int) -> None:
+    # Small files: reads into a reused buffer beat setting up a mapping (and
+    # allocating a fresh bytes object per read).
+    with open(fd, "rb", buffering=0, closefd=False) as f:
+        if hasattr(hashlib, "file_digest"):
+            hashlib.file_digest(f, lambda: h)
+            return
+        view = _copy_buffer()
+        while n := f.readinto(view):
+            h.update(view[:n])
+
+
+def _hash_file_into(h: Any, path: Path) -> None:
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        size = os.fstat(fd).st_size
+        if size == 0:
+            return
+        if size < _MMAP_MIN:
+            _hash_small_into(h, fd)
+            return
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        # A read-only mapping lets the kernel (or the Windows cache manager)
+        # prefetch ahead of the hash loop without copying into Python buffers.
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+            willneed = getattr(mmap, "MADV_WILLNEED", None)
+            with memoryview(mm) as view:
+                for offset in range(0, size, _HASH_SLICE):
+                    ahead = offset + _HASH_SLICE
+                    if willneed is not None and ahead < size:
+                        # Start reading the next slice while this one hashes.
+                        mm.madvise(willneed, ahead, min(_HASH_SLICE, size - ahead))
+                    h.update(view[offset:ahead])
+    finally:
+        os.close(fd)
+
+
 def sha256_file(path: Path) -> str:
     h = hashlib.sha256()
-    with path.open("rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
+    _hash_file_into(h, path)
     return h.hexdigest()
 
 
+HASH_ALGOS = ("blake3", "blake2b", "sha256")
+
+
+@lru_cache(maxsize=None)
+def _blake3_module() -> Any:
+    try:
+        import blake3  # type: ignore
+    except Exception:
+        return None
+    return blake3
+
+
+def resolve_hash_algo(algo: str) -> str:
+    """Algorithm that will actually be used for `algo` (blake3 may fall back)."""
+    if algo == "blake3" and _blake3_module() is None:
+        return "blake2b"
+    return algo
+
+
+def new_hasher(algo: str) -> Tuple[str, Any]:
+    """Return (algo actually used, hash object); blake3 falls back to blake2b."""
+    algo = resolve_hash_algo(algo)
+    if algo == "blake3":
+        return "blake3", _blake3_module().blake3()
+    if algo == "sha256":
+        return "sha256", hashlib.sha256()
+    if algo == "blake2b":
+        return "blake2b", hashlib.blake2b()
+    raise ValueError(f"Unsupported hash algorithm: {algo}")
+
+
+def file_digest(path: Path, algo: str = "sha256") -> Tuple[str, str]:
+    """Hash a file; returns (algo actually used, hex digest).
+
+    blake3 falls back to blake2b when the blake3 package is not installed.
+    """
+    algo = resolve_hash_algo(algo)
+    if algo == "sha256":
+        return "sha256", sha256_file(path)
+    if algo == "blake3":
+        blake3 = _blake3_module()
+        h = blake3.blake3(max_threads=blake3.blake3.AUTO)
+        h.update_mmap(str(path))
+        return "blake3", h.hexdigest()
+    used, h = new_hasher(algo)
+    _hash_file_into(h, path)
+    return used, h.hexdigest()
+
+
+_COPY_BUF_SIZE = 16 * 1024 * 1024
+_COPY_BUF = threading.local()
+
+
+def _copy_buffer() -> memoryview:
+    view = getattr(_COPY_BUF, "view", None)
+    if view is None:
+        view = memoryview(bytearray(_COPY_BUF_SIZE))
+        _COPY_BUF.view = view
+    return view
+
+
+# Linux sendfile accepts regular-file destinations; macOS only sockets.
+_SENDFILE = hasattr(os, "sendfile") and sys.platform.startswith("linux")
+
+
+def _sendfile_copy(in_fd: int, out_fd: int) -> bool:
+    size = os.fstat(in_fd).st_size
+    offset = 0
+    while offset < size:
+        try:
+            sent = os.sendfile(out_fd, in_fd, offset, size - offset)
+        except OSError as exc:
+            if offset == 0 and exc.errno in (errno.EINVAL, errno.ENOSYS, errno.ENOTSUP):
+                return False
+            raise
+        if sent == 0:
+            break
+        offset += sent
+    return True
+
+
+# copy_file_range can reflink on XFS/Btrfs and never leaves the kernel;
+# older kernels refuse cross-filesystem ranges, hence the fallbacks.
+_COPY_FILE_RANGE = hasattr(os, "copy_file_range") and sys.platform.startswith("linux")
+_COPY_RANGE_FALLBACK = (errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.ENOTSUP, errno.EPERM)
+
+
+def _copy_range(in_fd: int, out_fd: int) -> bool:
+    size = os.fstat(in_fd).st_size
+    copied = 0
+    while copied < size:
+        try:
+            n = os.copy_file_range(in_fd, out_fd, size - copied)
+        except OSError as exc:
+            if copied == 0 and exc.errno in _COPY_RANGE_FALLBACK:
+                return False
+            raise
+        if n == 0:
+            break
+        copied += n
+    return True
+
+
+def copy_file_buffered(src: Path, dst: Path) -> None:
+    """
+    Copy src -> dst in the kernel via copy_file_range or sendfile where
+    supported, otherwise through a reusable 16 MiB per-thread buffer, then
+    copy stat metadata (same result as shutil.copy2 for regular files).
+    """
+    with open(src, "rb", buffering=0) as fi, open(dst, "wb", buffering=0) as fo:
+        in_fd, out_fd = fi.fileno(), fo.fileno()
+        if _COPY_FILE_RANGE and _copy_range(in_fd, out_fd):
+            pass
+        elif not (_SENDFILE and _sendfile_copy(in_fd, out_fd)):
+            view = _copy_buffer()
+            while True:
+                n = fi.readinto(view)
+                if not n:
+                    break
+                chunk = view[:n]
+                while chunk:
+                    chunk = chunk[fo.write(chunk):]
+    shutil.copystat(src, dst)
+
+
+def link_or_copy(src: Path, dst: Path) -> bool:
+    """
+    Hardlink dst to src when both are on the same filesystem, otherwise fall
+    back to copy_file_buffered. dst must not exist. Returns True if linked.
+    """
+    try:
+        os.link(src, dst)
+        return True
+    except OSError:
+        copy_file_buffered(src, dst)
+        return False
+
+
+def copy_file_hashed(src: Path, dst: Path, algo: str = "sha256") -> Tuple[str, str]:
+    """
+    Copy src -> dst through the per-thread buffer, hashing each chunk on the
+    way; returns (algo actually used, hex digest of the copied bytes).
+    """
+    used, h = new_hasher(algo)
+    view = _copy_buffer()
+    with open(src, "rb", buffering=0) as fi, open(dst, "wb", buffering=0) as fo:
+        while True:
+            n = fi.readinto(view)
+            if not n:
+                break
+            chunk = view[:n]
+            h.update(chunk)
+            while chunk:
+                chunk = chunk[fo.write(chunk):]
+    shutil.copystat(src, dst)
+    return used, h.hexdigest()
+
+
+def _fadvise(path: Path, advice_name: str) -> None:
+    advice = getattr(os, advice_name, None)
+    if advice is None or not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, advice)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _prefetch(path: Path) -> None:
+    # The verified copy is extracted next; ask the kernel to keep it cached.
+    _fadvise(path, "POSIX_FADV_WILLNEED")
+
+
+_DROP_CACHE_MIN = 256 * 1024 * 1024
+
+
+def _drop_cache(path: Path) -> None:
+    # The source is not read again this run; let a multi-GB input leave the
+    # page cache instead of evicting the copy that is about to be extracted.
+    _fadvise(path, "POSIX_FADV_DONTNEED")
+
+
+def _unlink_quiet(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+_FAST_RM = shutil.which("rm") if os.name != "nt" else None
+
+
+def fast_rmtree(root: Path, max_workers: int = 8) -> None:
+    """
+    Best-effort equivalent of shutil.rmtree(root, ignore_errors=True).
+    Uses native rm -rf when available; otherwise file unlinks are fanned
+    out to a thread pool and directories are removed afterwards, deepest first.
+    """
+    if _FAST_RM:
+        subprocess.run(
+            [_FAST_RM, "-rf", "--", str(root)],
+            check=False,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        if not os.path.lexists(root):
+            return
+    files: List[str] = []
+    dirs: List[str] = []
+    stack = [str(root)]
+    while stack:
+        current = stack.pop()
+        dirs.append(current)
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        files.append(entry.path)
+        except OSError:
+            continue
+
+    if files:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            list(pool.map(_unlink_quiet, files))
+
+    # Parents are recorded before their children, so reverse order is post-order.
+    for d in reversed(dirs):
+        try:
+            os.rmdir(d)
+        except OSError:
+            pass
+
+
+def _report_discard(proc: subprocess.Popen, trash: Path, errors: Any, log: logging.Logger) -> None:
+    # Runs on a daemon thread; if this process exits first the delete still
+    # finishes, it just goes unreported.
+    try:
+        code = proc.wait()
+        if code != 0 or trash.exists():
+            errors.seek(0)
+            detail = errors.read().decode("utf-8", "replace").strip()
+            log.warning("Background delete of %s failed (code=%s): %s", trash, code, detail)
+    finally:
+        errors.close()
+
+
+def discard_tree(
+    root: Path,
+    trash_dir: Optional[Path] = None,
+    logger: Optional[logging.Logger] = None,
+) -> Optional[Path]:
+    """
+    Move root aside with a single rename and delete it in a detached
+    process, so the run does not wait on the unlink walk. trash_dir (same
+    filesystem) keeps the doomed tree out of root's parent. Falls back to
+    deleting in-process when either step is not possible. A failed
+    background delete is logged (while this process is still running).
+    Returns the renamed path when deletion was handed off.
+    """
+    log = logger or logging.getLogger(__name__)
+    trash = (Path(trash_dir) if trash_dir else root.parent) / (
+        f"{root.name}.deleting.{uuid.uuid4().hex[:8]}"
+    )
+    try:
+        os.rename(root, trash)
+    except OSError:
+        fast_rmtree(root)
+        return None
+    if os.name == "nt":
+        cmd = ["cmd", "/c", "rd", "/s", "/q", str(trash)]
+        kwargs: Dict[str, Any] = {
+            "creationflags": subprocess.DETACHED_PROCESS
+            | subprocess.CREATE_NEW_PROCESS_GROUP
+        }
+    else:
+        cmd = [_FAST_RM or "rm", "-rf", "--", str(trash)]
+        kwargs = {"start_new_session": True}
+    # An unnamed temp file rather than a pipe: the child keeps writing to it
+    # safely even after this process has exited.
+    errors = tempfile.TemporaryFile()
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=errors,
+            **kwargs,
+        )
+    except OSError:
+        errors.close()
+        fast_rmtree(trash)
+        return None
+    threading.Thread(
+        target=_report_discard, args=(proc, trash, errors, log), daemon=True
+    ).start()
+    return trash
+
+
 def copy_with_integrity(
     src: Path,
     dst: Path,
@@ -165,10 +574,11 @@ def copy_with_integrity(
                 dst.unlink()
             except Exception:
                 pass
-        shutil.copy2(src, dst)
+        # The source digest is taken from the bytes as they are copied, so the
+        # source is read once; the destination is still read back from disk.
+        _, src_hash = copy_file_hashed(src, dst, "sha256")
         src_size = src.stat().st_size
         dst_size = dst.stat().st_size if dst.exists() else None
-        src_hash = sha256_file(src)
         dst_hash = sha256_file(dst) if dst.exists() else None
         ok = (src_size == dst_size) and (src_hash == dst_hash)
         last = {
@@ -182,6 +592,9 @@ def copy_with_integrity(
             "ok": ok,
         }
         if ok:
+            _prefetch(dst)
+            if src_size >= _DROP_CACHE_MIN:
+                _drop_cache(src)
             log.info(
                 "Copy verified: %s -> %s (size=%s sha256=%s)",
                 src,
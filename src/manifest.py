@@ -1,30 +1,221 @@
 # PURPOSE: Capture file metadata and write run manifests.
 # INPUTS: Paths and manifest payload dicts.
 # OUTPUTS: JSON manifest files.
-# NOTES: Hashing optional via sha256.
+# NOTES: Hashing optional (sha256/blake2b/blake3); orjson used for serialization when installed.
+#        Digests can persist across runs in a per-case sidecar (user cache dir)
+#        keyed by size/mtime_ns.
 from __future__ import annotations
 
+import contextlib
+import hashlib
 import json
+import os
+import stat
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from pathlib import Path
-from typing import Any, Dict
+from functools import lru_cache
+from pathlib import Path, PurePath
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from src.logutil import sha256_file
+from src.logutil import file_digest
 
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
 
-def file_metadata(path: Path, *, compute_hash: bool = False) -> Dict[str, Any]:
-    data: Dict[str, Any] = {"path": str(path), "exists": path.exists()}
-    if not path.exists():
-        return data
-    st = path.stat()
-    data["size_bytes"] = st.st_size
-    data["mtime"] = datetime.fromtimestamp(st.st_mtime).isoformat(timespec="seconds")
-    if compute_hash and path.is_file():
-        data["sha256"] = sha256_file(path)
+
+@lru_cache(maxsize=2048)
+def _stat_meta(path_str: str, mtime: float, size: int) -> Dict[str, Any]:
+    # mtime/size are part of the key, so a modified file gets a fresh entry.
+    return {
+        "path": path_str,
+        "exists": True,
+        "size_bytes": size,
+        "mtime": datetime.fromtimestamp(mtime).isoformat(timespec="seconds"),
+    }
+
+
+# Digests computed while a file was being written (see record_digest), by
+# this process, or by an earlier run (see load_hash_cache).
+_KNOWN_DIGESTS: Dict[Tuple[str, int, int, str], Tuple[str, str]] = {}
+
+
+@lru_cache(maxsize=256)
+def _digest_cached(path_str: str, mtime_ns: int, size: int, algo: str) -> Tuple[str, str]:
+    # Same keying as _stat_meta: a rewritten file misses and is re-hashed.
+    key = (os.path.abspath(path_str), mtime_ns, size, algo)
+    known = _KNOWN_DIGESTS.get(key)
+    if known is None:
+        known = _KNOWN_DIGESTS[key] = file_digest(Path(path_str), algo)
+    return known
+
+
+def record_digest(path: Path, algo: str, used: str, digest: str) -> None:
+    """Remember a digest taken during a copy so file_metadata skips the re-read."""
+    st = os.stat(path)
+    _KNOWN_DIGESTS[(os.path.abspath(path), st.st_mtime_ns, st.st_size, algo)] = (used, digest)
+
+
+def hash_cache_path(case_dir: Path) -> Path:
+    """Sidecar for one case dir, under the user's cache dir (not the delivered tree)."""
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME")
+    root = os.path.abspath(case_dir)
+    tag = hashlib.sha256(root.encode("utf-8")).hexdigest()[:16]
+    return Path(base or Path.home() / ".cache") / "peda" / "hash_cache" / f"{Path(root).name}-{tag}.json"
+
+
+def load_hash_cache(path: Path, root: Path) -> None:
+    """Seed known digests for files under `root` from a save_hash_cache sidecar."""
+    try:
+        entries = json.loads(Path(path).read_bytes())
+    except (OSError, ValueError):
+        return
+    if not isinstance(entries, dict):
+        return
+    prefix = os.path.join(os.path.abspath(root), "")
+    for rel, entry in entries.items():
+        file_path = os.path.abspath(os.path.join(prefix, *str(rel).split("/")))
+        if not file_path.startswith(prefix):
+            continue
+        try:
+            key = (file_path, int(entry["mtime_ns"]), int(entry["size"]), str(entry["algo"]))
+            _KNOWN_DIGESTS.setdefault(key, (str(entry["used"]), str(entry["digest"])))
+        except (KeyError, TypeError, ValueError):
+            continue
+
+
+def save_hash_cache(path: Path, root: Path) -> None:
+    """Write known digests of unchanged files under `root`, with root-relative paths.
+
+    Those entries are then dropped from memory; the sidecar is their copy.
+    """
+    prefix = os.path.join(os.path.abspath(root), "")
+    entries: Dict[str, Dict[str, Any]] = {}
+    for key in [k for k in _KNOWN_DIGESTS if k[0].startswith(prefix)]:
+        file_path, mtime_ns, size, algo = key
+        used, digest = _KNOWN_DIGESTS.pop(key)
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            continue
+        if st.st_mtime_ns == mtime_ns and st.st_size == size:
+            rel = os.path.relpath(file_path, prefix).replace(os.sep, "/")
+            entries[rel] = {
+                "size": size,
+                "mtime_ns": mtime_ns,
+                "algo": algo,
+                "used": used,
+                "digest": digest,
+            }
+    write_manifest(Path(path), entries)
+
+
+def file_metadata(
+    path: Path,
+    *,
+    compute_hash: bool = False,
+    hash_algo: str = "sha256",
+    hash_mode: str = "content",
+    precomputed_sha256: Optional[str] = None,
+) -> Dict[str, Any]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return {"path": str(path), "exists": False}
+    data = dict(_stat_meta(str(path), st.st_mtime, st.st_size))
+    if compute_hash and precomputed_sha256 and stat.S_ISREG(st.st_mode):
+        # A content digest taken earlier in the run (e.g. a verified copy).
+        data["hash_algo"] = "sha256"
+        data["digest"] = precomputed_sha256
+        data["sha256"] = precomputed_sha256
+    elif compute_hash and hash_mode == "metadata":
+        # Fingerprint of path/size/mtime only; the file is not read.
+        key = f"{path}|{st.st_size}|{st.st_mtime_ns}".encode("utf-8")
+        data["hash_mode"] = "metadata"
+        data["hash_algo"] = "sha256"
+        data["digest"] = hashlib.sha256(key).hexdigest()
+    elif compute_hash and stat.S_ISREG(st.st_mode):
+        used, digest = _digest_cached(str(path), st.st_mtime_ns, st.st_size, hash_algo)
+        data["hash_algo"] = used
+        data["digest"] = digest
+        if used == "sha256":
+            # Kept for readers of manifests written before hash_algo existed.
+            data["sha256"] = digest
     return data
 
 
+def file_metadata_many(
+    paths: Sequence[Path],
+    *,
+    compute_hash: bool = False,
+    hash_algo: str = "sha256",
+    hash_mode: str = "content",
+    precomputed_sha256: Optional[Sequence[Optional[str]]] = None,
+    max_workers: int = 8,
+) -> List[Dict[str, Any]]:
+    """file_metadata for each path, in order; content hashes run on a thread pool."""
+    known = list(precomputed_sha256 or ())
+    known += [None] * (len(paths) - len(known))
+
+    def _one(p: Path, sha: Optional[str]) -> Dict[str, Any]:
+        return file_metadata(
+            p,
+            compute_hash=compute_hash,
+            hash_algo=hash_algo,
+            hash_mode=hash_mode,
+            precomputed_sha256=sha,
+        )
+
+    if not compute_hash or hash_mode == "metadata" or len(paths) < 2:
+        return [_one(p, sha) for p, sha in zip(paths, known)]
+    # hashlib releases the GIL on large updates, so separate files hash in parallel.
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as pool:
+        return list(pool.map(_one, paths, known))
+
+
+def _json_default(obj: Any) -> Any:
+    # Paths are stringified during serialization instead of in a pre-pass.
+    if isinstance(obj, PurePath):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps(payload: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                payload,
+                default=_json_default,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+            )
+        except TypeError:
+            # orjson is stricter (e.g. ints beyond 64 bits); stdlib still copes.
+            pass
+    return json.dumps(
+        payload, indent=2, ensure_ascii=False, default=_json_default
+    ).encode("utf-8")
+
+
 def write_manifest(path: Path, payload: Dict[str, Any]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(payload, f, indent=2)
+    data = _dumps(payload)
+    # Serialize up front, write the bytes in one go, then rename into place so
+    # readers never observe a partially written manifest. The temp name is
+    # unique, so concurrent writers in one directory never share it.
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+        raise
@@ -38,28 +38,36 @@ def tdc_log_path(case_dir: Path, case_id: str, tdc_date_token: str) -> Path:
 
 def _collect_forbidden_log_dirs(case_dir: Path) -> List[Path]:
     case_dir = Path(case_dir)
+    root = str(case_dir)
     offenders: Set[Path] = set()
 
-    for path in case_dir.rglob("*"):
-        if not path.is_dir():
-            continue
-        name_lower = path.name.lower()
-        if name_lower.startswith("logs__"):
-            offenders.add(path)
+    # One scandir walk applies every rule; like rglob, symlinked dirs are
+    # reported but not descended into. Misc/Logs__* is covered by logs__.
+    stack = [(root, False)]
+    while stack:
+        current, under_tdc = stack.pop()
+        parent_lower = os.path.basename(current).lower()
+        try:
+            with os.scandir(current) as it:
+                entries = list(it)
+        except OSError:
             continue
-    tdc_root = case_dir / "TDC Sessions"
-    if tdc_root.exists():
-        for path in tdc_root.rglob("*"):
-            if not path.is_dir():
+        for entry in entries:
+            try:
+                if not entry.is_dir():
+                    continue
+            except OSError:
                 continue
-            if path.name.lower() == "applog":
-                offenders.add(path)
-                continue
-            if path.name.lower() == "logs" and path.parent.name.lower() == "applog":
-                offenders.add(path)
-
-    misc_logs_glob = list((case_dir / "Misc").glob("Logs__*"))
-    offenders.update([p for p in misc_logs_glob if p.is_dir()])
+            name_lower = entry.name.lower()
+            if name_lower.startswith("logs__"):
+                offenders.add(Path(entry.path))
+            elif under_tdc and (
+                name_lower == "applog" or (name_lower == "logs" and parent_lower == "applog")
+            ):
+                offenders.add(Path(entry.path))
+            if not entry.is_symlink():
+                in_tdc = under_tdc or (current == root and entry.name == "TDC Sessions")
+                stack.append((entry.path, in_tdc))
 
     return sorted(offenders, key=lambda p: str(p).lower())
 
@@ -21,9 +21,18 @@ RULE_TEMPLATES: Dict[str, str] = {
 }
 
 
+# Only these templates mention the case ID; the rest are copied as-is.
+_TEMPLATED_RULES: Dict[str, str] = {
+    tag: value for tag, value in RULE_TEMPLATES.items() if "{case_id}" in value
+}
+
+
 def build_dicom_rules(case_id: str) -> Dict[str, str]:
     """
     Materialize tag rewrite rules for a given case ID.
     This does not modify files; it is a policy map only.
     """
-    return {tag: value.replace("{case_id}", case_id) for tag, value in RULE_TEMPLATES.items()}
+    rules = dict(RULE_TEMPLATES)
+    for tag, value in _TEMPLATED_RULES.items():
+        rules[tag] = value.replace("{case_id}", case_id)
+    return rules
@@ -5,15 +5,19 @@
 from __future__ import annotations
 
 import argparse
+import copy
 import json
 import os
 import re
+import shutil
+import sys
 import tempfile
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, Optional, Tuple, List
 
-from src.logutil import ValidationError
+from src.logutil import HASH_ALGOS, ValidationError
 from src.path_utils import sanitize_path_str
 
 PATH_KEYS = {
@@ -50,6 +54,8 @@ DEFAULTS: Dict[str, Any] = {
     "run_id": None,
     "dry_run": False,
     "hash_outputs": False,
+    "hash_algo": "sha256",
+    "hash_mode": "auto",
     "test_mode": False,
     "allow_workspace_zips": False,
     "legacy_filename_rules": False,
@@ -58,6 +64,8 @@ DEFAULTS: Dict[str, Any] = {
     "localdb_strict": True,
     "localdb_path": None,
     "unzip_inputs": False,
+    "parallel_steps": False,
+    "allow_hardlink_pdf": False,
     "cleanup_enabled": True,
     "cleanup_dry_run": False,
     "cleanup_patterns": [
@@ -166,6 +174,23 @@ def _load_config_file(path: Path) -> Dict[str, Any]:
         return _load_json(path)
 
 
+@lru_cache(maxsize=16)
+def _load_config_file_cached(
+    path_str: str, mtime_ns: int, size: int
+) -> Dict[str, Any]:
+    return _load_config_file(Path(path_str))
+
+
+def _load_config_file_memo(path: Path) -> Dict[str, Any]:
+    """
+    Parse a config file once per process. The cache key includes mtime and
+    size, so an edited file on disk is re-read; callers get a private copy.
+    """
+    st = path.stat()
+    data = _load_config_file_cached(str(path), st.st_mtime_ns, st.st_size)
+    return copy.deepcopy(data)
+
+
 def _apply_overrides(base: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
     merged = dict(base)
     for k, v in overrides.items():
@@ -321,6 +346,12 @@ def _flatten_nested(cfg: Dict[str, Any]) -> Dict[str, Any]:
         "hash_outputs": run_block.get(
             "hash_outputs", cfg.get("hash_outputs", DEFAULTS["hash_outputs"])
         ),
+        "hash_algo": run_block.get(
+            "hash_algo", cfg.get("hash_algo", DEFAULTS["hash_algo"])
+        ),
+        "hash_mode": run_block.get(
+            "hash_mode", cfg.get("hash_mode", DEFAULTS["hash_mode"])
+        ),
         "localdb_enabled": localdb_block.get(
             "enabled", cfg.get("localdb_enabled", DEFAULTS["localdb_enabled"])
         ),
@@ -334,6 +365,13 @@ def _flatten_nested(cfg: Dict[str, Any]) -> Dict[str, Any]:
         "unzip_inputs": pipeline_block.get(
             "unzip_inputs", cfg.get("unzip_inputs", DEFAULTS["unzip_inputs"])
         ),
+        "parallel_steps": pipeline_block.get(
+            "parallel_steps", cfg.get("parallel_steps", DEFAULTS["parallel_steps"])
+        ),
+        "allow_hardlink_pdf": pipeline_block.get(
+            "allow_hardlink_pdf",
+            cfg.get("allow_hardlink_pdf", DEFAULTS["allow_hardlink_pdf"]),
+        ),
         "cleanup_enabled": cleanup_block.get(
             "enabled", cfg.get("cleanup_enabled", DEFAULTS["cleanup_enabled"])
         ),
@@ -559,12 +597,40 @@ def _resolve_auto_inputs(cfg: Dict[str, Any]) -> Dict[str, Any]:
     return cfg
 
 
+SCRATCH_POLICIES = ("local_temp", "case_root", "tmpfs")
+_TMPFS_ROOT = Path("/dev/shm")
+# Backup, extracted tree and staged copy can all sit in scratch at once.
+_TMPFS_HEADROOM = 3
+
+
+def _tmpfs_base(cfg: Dict[str, Any]) -> Optional[Path]:
+    if not sys.platform.startswith("linux") or not _TMPFS_ROOT.is_dir():
+        return None
+    needed = 0
+    for key in ("mri_input", "tdc_input"):
+        val = cfg.get(key)
+        if val:
+            try:
+                needed += os.stat(val).st_size
+            except OSError:
+                pass
+    try:
+        free = shutil.disk_usage(_TMPFS_ROOT).free
+    except OSError:
+        return None
+    return _TMPFS_ROOT if free >= needed * _TMPFS_HEADROOM else None
+
+
 def _resolve_scratch(cfg: Dict[str, Any]) -> Dict[str, Any]:
     scratch = cfg.get("scratch")
     policy = cfg.get("scratch_policy", DEFAULTS["scratch_policy"])
     if scratch is None:
-        if policy == "local_temp":
-            base = Path(os.environ.get("TEMP") or tempfile.gettempdir())
+        if policy in ("local_temp", "tmpfs"):
+            # tmpfs keeps the staged zips in RAM so the hash and extract passes
+            # after the copy never touch disk; falls back to local_temp.
+            base = (_tmpfs_base(cfg) if policy == "tmpfs" else None) or Path(
+                os.environ.get("TEMP") or tempfile.gettempdir()
+            )
             scratch = base / "PEDA" / str(cfg.get("case")) / str(cfg.get("run_id"))
         elif policy == "case_root":
             case_dir = cfg.get("case_dir")
@@ -572,7 +638,7 @@ def _resolve_scratch(cfg: Dict[str, Any]) -> Dict[str, Any]:
                 scratch = Path(case_dir) / "scratch"
         else:
             raise ValidationError(
-                f"scratch_policy must be 'local_temp' or 'case_root', got {policy}"
+                f"scratch_policy must be one of {', '.join(SCRATCH_POLICIES)}, got {policy}"
             )
     cfg["scratch"] = scratch
     cfg["scratch_policy"] = policy
@@ -611,6 +677,8 @@ def _validate_config(cfg: Dict[str, Any]) -> None:
         "localdb_check_only",
         "localdb_strict",
         "unzip_inputs",
+        "parallel_steps",
+        "allow_hardlink_pdf",
         "cleanup_enabled",
         "cleanup_dry_run",
         "dicom_anon_enabled",
@@ -619,6 +687,10 @@ def _validate_config(cfg: Dict[str, Any]) -> None:
         val = cfg.get(key)
         if not isinstance(val, bool):
             raise ValidationError(f"{key} must be a boolean")
+    if cfg.get("hash_algo") not in HASH_ALGOS:
+        raise ValidationError(f"hash_algo must be one of {', '.join(HASH_ALGOS)}")
+    if cfg.get("hash_mode") not in ("content", "metadata", "auto"):
+        raise ValidationError("hash_mode must be 'content', 'metadata', or 'auto'")
     if not isinstance(cfg.get("cleanup_patterns"), list):
         raise ValidationError("cleanup_patterns must be a list")
     if not isinstance(cfg.get("dicom_anon_mode"), str):
@@ -648,8 +720,8 @@ def _validate_config(cfg: Dict[str, Any]) -> None:
     if cfg.get("log_level") is None:
         raise ValidationError("log_level must be set")
     policy = cfg.get("scratch_policy", DEFAULTS["scratch_policy"])
-    if policy not in ("local_temp", "case_root"):
-        raise ValidationError("scratch_policy must be 'local_temp' or 'case_root'")
+    if policy not in SCRATCH_POLICIES:
+        raise ValidationError(f"scratch_policy must be one of {', '.join(SCRATCH_POLICIES)}")
 
 
 def resolve_config(
@@ -670,7 +742,7 @@ def resolve_config(
         cfg_path = Path(sanitize_path_str(str(config_path)))
         if not cfg_path.exists():
             raise ValidationError(f"Config file not found: {cfg_path}")
-        cfg_data = _load_config_file(cfg_path)
+        cfg_data = _load_config_file_memo(cfg_path)
     else:
         cfg_data = {}
 
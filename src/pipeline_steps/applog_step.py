@@ -10,7 +10,7 @@ import shutil
 from pathlib import Path
 from typing import Optional, Tuple, List, Dict, Any, Iterable
 
-from src.logutil import ProcessingError
+from src.logutil import ProcessingError, copy_file_hashed
 from src.paths import misc_logs_dir, tdc_log_path
 
 
@@ -31,8 +31,8 @@ def verified_copy(src: Path, dst: Path) -> Dict[str, Any]:
     dst.parent.mkdir(parents=True, exist_ok=True)
     if dst.exists():
         dst.unlink()
-    shutil.copy2(src, dst)
-    src_hash = sha256_file(src)
+    # Source is hashed as it is copied; the destination is read back.
+    _, src_hash = copy_file_hashed(src, dst, "sha256")
     dst_hash = sha256_file(dst) if dst.exists() else ""
     if src_hash != dst_hash:
         if dst.exists():
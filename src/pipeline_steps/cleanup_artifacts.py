@@ -4,6 +4,7 @@
 # NOTES: Refuses unsafe roots (drive root, home dir); logs each deletion.
 from __future__ import annotations
 
+import fnmatch
 import logging
 import os
 import stat
@@ -61,6 +62,36 @@ def _try_unlink(path: Path) -> bool:
         return False
 
 
+def _find_candidates(root: Path, patterns: List[str]) -> List[Path]:
+    """
+    Same matches as root.rglob(pattern) for each pattern, grouped in pattern
+    order, but from a single os.scandir walk of the tree. Patterns with a
+    path separator still go through rglob.
+    """
+    name_patterns = [p for p in patterns if "/" not in p and os.sep not in p]
+    buckets: List[List[Path]] = [[] for _ in patterns]
+    if name_patterns:
+        index = {p: i for i, p in reversed(list(enumerate(patterns)))}
+        stack = [str(root)]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        for pattern in name_patterns:
+                            if fnmatch.fnmatch(entry.name, pattern):
+                                buckets[index[pattern]].append(Path(entry.path))
+                                break
+            except OSError:
+                continue
+    for i, pattern in enumerate(patterns):
+        if pattern not in name_patterns:
+            buckets[i].extend(root.rglob(pattern))
+    return [path for bucket in buckets for path in bucket]
+
+
 def cleanup_artifacts(root: Path, patterns: List[str], dry_run: bool = False) -> Dict[str, Any]:
     log = logging.getLogger(__name__)
     root = Path(root)
@@ -77,9 +108,7 @@ def cleanup_artifacts(root: Path, patterns: List[str], dry_run: bool = False) ->
         }
 
     patterns = patterns or []
-    candidates = []
-    for pattern in patterns:
-        candidates.extend(root.rglob(pattern))
+    candidates = _find_candidates(root, patterns)
 
     seen = set()
     deleted: List[str] = []
@@ -5,8 +5,9 @@
 from __future__ import annotations
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Set, Tuple
 
 from src.archive_utils import extract_archive
 from src.logutil import ProcessingError
@@ -32,19 +33,29 @@ def _ensure_under_root(dest_root: Path, candidate: Path) -> Path:
     return candidate
 
 
-def _unique_dest(dest_root: Path, base_name: str) -> Path:
+def _unique_dest(dest_root: Path, base_name: str, claimed: Set[Path] | None = None) -> Path:
+    claimed = claimed if claimed is not None else set()
     candidate = _ensure_under_root(dest_root, dest_root / base_name)
-    if not candidate.exists():
+    if not candidate.exists() and candidate not in claimed:
         return candidate
     n = 1
     while True:
         candidate = _ensure_under_root(dest_root, dest_root / f"{base_name}__{n}")
-        if not candidate.exists():
+        if not candidate.exists() and candidate not in claimed:
             return candidate
         n += 1
 
 
-def expand_archives(input_paths: List[Path], dest_root: Path) -> Dict[str, Any]:
+def _extract_one(path: Path, dest_dir: Path) -> None:
+    try:
+        extract_archive(path, dest_dir, prefer_7z=True)
+    except Exception as exc:
+        raise ProcessingError(f"Input unzip failed: {path} -> {dest_dir}: {exc}") from exc
+
+
+def expand_archives(
+    input_paths: List[Path], dest_root: Path, max_workers: int = 2
+) -> Dict[str, Any]:
     log = logging.getLogger(__name__)
     dest_root = Path(dest_root)
     dest_root.mkdir(parents=True, exist_ok=True)
@@ -52,6 +63,8 @@ def expand_archives(input_paths: List[Path], dest_root: Path) -> Dict[str, Any]:
     expanded = 0
     skipped = 0
     items: List[Dict[str, Any]] = []
+    jobs: List[Tuple[Path, Path]] = []
+    claimed: Set[Path] = set()
 
     for raw in input_paths:
         if raw is None:
@@ -69,15 +82,25 @@ def expand_archives(input_paths: List[Path], dest_root: Path) -> Dict[str, Any]:
             continue
 
         base_name = _strip_zip_suffix(path.name)
-        dest_dir = _unique_dest(dest_root, base_name)
-        log.info("Unzip input: %s -> %s", path, dest_dir)
-        try:
-            extract_archive(path, dest_dir, prefer_7z=True)
-        except Exception as exc:
-            raise ProcessingError(f"Input unzip failed: {path} -> {dest_dir}: {exc}") from exc
-        expanded += 1
+        dest_dir = _unique_dest(dest_root, base_name, claimed)
+        claimed.add(dest_dir)
+        jobs.append((path, dest_dir))
         items.append({"src": str(path), "dest": str(dest_dir), "status": "expanded"})
 
+    # Destinations are fixed up front so names stay deterministic; the
+    # extractions themselves are independent and overlap well on I/O.
+    for path, dest_dir in jobs:
+        log.info("Unzip input: %s -> %s", path, dest_dir)
+    if len(jobs) > 1 and max_workers > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as pool:
+            futures = [pool.submit(_extract_one, path, dest) for path, dest in jobs]
+        for future in futures:
+            future.result()
+    else:
+        for path, dest_dir in jobs:
+            _extract_one(path, dest_dir)
+    expanded = len(jobs)
+
     return {
         "status": "ok",
         "dest_root": str(dest_root),
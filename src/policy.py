@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from typing import Any, Dict, Tuple
 
 
 @dataclass(frozen=True)
@@ -14,18 +15,19 @@ class RunPolicy:
     skip_tdc: bool
     clean_scratch: bool
     hash_outputs: bool
+    hash_algo: str
+    hash_mode: str
     date_shift_days: int
 
 
+_POLICY_FIELDS = tuple(f.name for f in fields(RunPolicy))
+
+
+@lru_cache(maxsize=None)
+def _policy_from_values(values: Tuple[Any, ...]) -> RunPolicy:
+    return RunPolicy(**dict(zip(_POLICY_FIELDS, values)))
+
+
 def policy_from_args_and_cfg(args: Any, cfg: Dict[str, Any]) -> RunPolicy:
-    return RunPolicy(
-        test_mode=cfg["test_mode"],
-        allow_workspace_zips=cfg["allow_workspace_zips"],
-        legacy_filename_rules=cfg["legacy_filename_rules"],
-        dry_run=cfg["dry_run"],
-        skip_mri=cfg["skip_mri"],
-        skip_tdc=cfg["skip_tdc"],
-        clean_scratch=cfg["clean_scratch"],
-        hash_outputs=cfg["hash_outputs"],
-        date_shift_days=cfg["date_shift_days"],
-    )
+    # RunPolicy is frozen, so identical flag sets can share one instance.
+    return _policy_from_values(tuple(cfg[name] for name in _POLICY_FIELDS))
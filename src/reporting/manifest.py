@@ -5,14 +5,53 @@ import platform
 import socket
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Sequence
 
 from src.manifest import file_metadata as _file_metadata
+from src.manifest import file_metadata_many as _file_metadata_many
 from src.manifest import write_manifest as _write_manifest
 
+# Fixed for the life of the process; platform.platform() in particular can
+# probe the OS, so resolve these once at import and splice them into each
+# payload.
+_MANIFEST_SKELETON: Dict[str, Any] = {
+    "hostname": socket.gethostname(),
+    "user": getpass.getuser(),
+    "platform": platform.platform(),
+    "python_version": platform.python_version(),
+}
 
-def file_metadata(path: Path, compute_hash: bool = False) -> Dict[str, Any]:
-    return _file_metadata(path, compute_hash=compute_hash)
+
+def file_metadata(
+    path: Path,
+    compute_hash: bool = False,
+    hash_algo: str = "sha256",
+    hash_mode: str = "content",
+    precomputed_sha256: Optional[str] = None,
+) -> Dict[str, Any]:
+    return _file_metadata(
+        path,
+        compute_hash=compute_hash,
+        hash_algo=hash_algo,
+        hash_mode=hash_mode,
+        precomputed_sha256=precomputed_sha256,
+    )
+
+
+def file_metadata_many(
+    paths: List[Path],
+    compute_hash: bool = False,
+    hash_algo: str = "sha256",
+    hash_mode: str = "content",
+    precomputed_sha256: Optional[Sequence[Optional[str]]] = None,
+) -> List[Dict[str, Any]]:
+    return _file_metadata_many(
+        paths,
+        compute_hash=compute_hash,
+        hash_algo=hash_algo,
+        hash_mode=hash_mode,
+        precomputed_sha256=precomputed_sha256,
+    )
 
 
 def write_manifest(path: Path, payload: Dict[str, Any]) -> None:
@@ -34,6 +73,9 @@ def build_manifest_payload(
     outputs_meta: Dict[str, Any],
     hash_outputs: bool,
     dry_run: bool,
+    hash_algo: str = "sha256",
+    hash_mode: str = "content",
+    plan_elided: bool = False,
 ) -> Dict[str, Any]:
     payload: Dict[str, Any] = {
         "run_id": run_id,
@@ -41,25 +83,34 @@ def build_manifest_payload(
         "case": case,
         "status": status,
         "test_mode": test_mode,
-        "hostname": socket.gethostname(),
-        "user": getpass.getuser(),
-        "platform": platform.platform(),
-        "python_version": platform.python_version(),
-        "config": {
-            k: str(v) if isinstance(v, Path) else v for k, v in cfg_for_manifest.items()
-        },
+        **_MANIFEST_SKELETON,
+        # Path values are stringified by write_manifest's serializer.
+        "config": cfg_for_manifest,
         "steps": step_results,
         "plan": planned_actions,
+        "plan_elided": plan_elided,
         "inputs": {},
         "outputs": {},
         "versions": {"rich": None, "yaml": None},
         "log_file": str(log_file),
     }
 
-    for label, path in inputs.items():
-        payload["inputs"][label] = file_metadata(
-            Path(path), compute_hash=hash_outputs
-        )
+    # Staging already hashed the MRI/TDC inputs while verifying their backups.
+    verified = {
+        info.get("src"): info.get("src_sha256")
+        for info in backups.values()
+        if isinstance(info, dict) and info.get("ok")
+    }
+    input_paths = [Path(p) for p in inputs.values()]
+    input_metas = file_metadata_many(
+        input_paths,
+        compute_hash=hash_outputs,
+        hash_algo=hash_algo,
+        hash_mode=hash_mode,
+        precomputed_sha256=[verified.get(str(p)) for p in input_paths],
+    )
+    for label, meta in zip(inputs, input_metas):
+        payload["inputs"][label] = meta
 
     for label, info in backups.items():
         payload["inputs"][label] = info
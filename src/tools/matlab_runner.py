@@ -73,14 +73,13 @@ def build_matlab_args(matlab_exe: Path, log_path: Path, batch_cmd: str) -> List[
 
 
 def _log_process_output(logger: logging.Logger, proc: subprocess.CompletedProcess[str]) -> None:
-    if proc.stdout:
-        for line in proc.stdout.splitlines():
-            if line.strip():
-                logger.info("MATLAB stdout: %s", line)
-    if proc.stderr:
-        for line in proc.stderr.splitlines():
-            if line.strip():
-                logger.error("MATLAB stderr: %s", line)
+    # One record per stream: each ERROR record flushes the buffered file handler.
+    out_lines = [line for line in (proc.stdout or "").splitlines() if line.strip()]
+    if out_lines:
+        logger.info("MATLAB stdout:\n%s", "\n".join(out_lines))
+    err_lines = [line for line in (proc.stderr or "").splitlines() if line.strip()]
+    if err_lines:
+        logger.error("MATLAB stderr:\n%s", "\n".join(err_lines))
 
 
 def _tail_log(path: Path, max_lines: int = 30) -> str:
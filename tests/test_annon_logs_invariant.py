@@ -6,7 +6,11 @@ from __future__ import annotations
 from pathlib import Path
 import pytest
 
-from src.paths import assert_no_forbidden_log_dirs, delete_forbidden_log_dirs
+from src.paths import (
+    _collect_forbidden_log_dirs,
+    assert_no_forbidden_log_dirs,
+    delete_forbidden_log_dirs,
+)
 
 
 def test_assert_no_tdc_applog_logs_raises(tmp_path: Path) -> None:
@@ -49,3 +53,28 @@ def test_delete_logs_suffix_dir(tmp_path: Path) -> None:
     assert logs_dir in removed
     assert not logs_dir.exists()
     assert_no_forbidden_log_dirs(case_dir)
+
+
+def test_collect_forbidden_log_dirs_rules(tmp_path: Path) -> None:
+    case_dir = tmp_path / "CASE"
+    for rel in (
+        "Misc/Logs__1",
+        "Misc/Logs",
+        "MR DICOM/a/b/LOGS__z",
+        "MR DICOM/applog",
+        "TDC Sessions/_S1/AppLog/logs",
+        "TDC Sessions/_S2/data/applog",
+        "TDC Sessions/_S2/Logs",
+    ):
+        (case_dir / rel).mkdir(parents=True, exist_ok=True)
+    (case_dir / "Misc" / "logs__file.txt").write_text("x", encoding="utf-8")
+
+    found = [p.relative_to(case_dir).as_posix() for p in _collect_forbidden_log_dirs(case_dir)]
+
+    assert found == [
+        "Misc/Logs__1",
+        "MR DICOM/a/b/LOGS__z",
+        "TDC Sessions/_S1/AppLog",
+        "TDC Sessions/_S1/AppLog/logs",
+        "TDC Sessions/_S2/data/applog",
+    ]
@@ -36,3 +36,21 @@ def test_cleanup_deletes_known_patterns(tmp_path: Path) -> None:
 def test_cleanup_refuses_home_dir() -> None:
     summary = cleanup_artifacts(Path.home(), DEFAULT_PATTERNS, dry_run=False)
     assert summary["status"] == "refused"
+
+
+def test_cleanup_single_walk_matches_rglob(tmp_path: Path) -> None:
+    root = tmp_path / "work"
+    for rel in ("a.mat", "s/b.mat", "s/t/local.db-wal", "s/t/x.db-shm", "s/keep.dcm"):
+        _write(root / rel, "x")
+    patterns = ["*.db-shm", "*.mat", "local.db-wal", "*.db-wal"]
+    expected = []
+    for pattern in patterns:
+        for path in sorted(root.rglob(pattern)):
+            if str(path) not in expected:
+                expected.append(str(path))
+
+    summary = cleanup_artifacts(root, patterns, dry_run=True)
+
+    assert sorted(summary["deleted"]) == sorted(expected)
+    assert summary["deleted"][0].endswith("x.db-shm")
+    assert (root / "s" / "keep.dcm").exists()
@@ -0,0 +1,146 @@
+# PURPOSE: Unit tests for in-place local.db anonymization.
+# INPUTS: Small sqlite databases built in tmp_path.
+# OUTPUTS: Assertions on rewritten rows and the summary dict.
+# NOTES: Covers rowid and WITHOUT ROWID tables.
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from src import localdb_anon
+from src.localdb_anon import anonymize_in_place
+
+
+def _make_db(path: Path) -> None:
+    con = sqlite3.connect(path)
+    con.executescript(
+        """
+        CREATE TABLE patients (id INTEGER, first_name TEXT, dob TEXT, notes TEXT, visit_date TEXT, dose REAL);
+        CREATE TABLE sessions (session_id TEXT PRIMARY KEY, start_time TEXT, email TEXT) WITHOUT ROWID;
+        CREATE TABLE empty_table (patient_name TEXT);
+        CREATE TABLE readings (sonication INTEGER, power REAL);
+        INSERT INTO readings VALUES (1, 10.5), (2, 11.0), (3, 9.75);
+        """
+    )
+    con.executemany(
+        "INSERT INTO patients VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (1, "Alice", "1980-05-17", "call back", "2024-01-02", 1.5),
+            (2, None, "bad-date", None, "2024/02/03", 2.0),
+        ],
+    )
+    con.execute(
+        "INSERT INTO sessions VALUES (?, ?, ?)", ("S1", "2024-01-02 10:00:00", "a@b.org")
+    )
+    con.commit()
+    con.close()
+
+
+def test_anonymize_in_place_rewrites_classified_columns(tmp_path: Path) -> None:
+    db = tmp_path / "local.db"
+    _make_db(db)
+
+    summary = anonymize_in_place(db, date_shift_days=10)
+
+    con = sqlite3.connect(db)
+    patients = con.execute("SELECT * FROM patients ORDER BY rowid").fetchall()
+    sessions = con.execute("SELECT * FROM sessions").fetchall()
+    con.close()
+    assert patients == [
+        (1, localdb_anon._first("Alice"), "1980-01-01", "[REDACTED]", "2024-01-12", 1.5),
+        (2, None, "bad-date", None, "2024-02-13", 2.0),
+    ]
+    # WITHOUT ROWID: the primary key is kept and used to address the row.
+    assert sessions == [("S1", "2024-01-12 10:00:00", localdb_anon._email("a@b.org"))]
+    assert {t["table"]: (t["rows"], t["updated_rows"]) for t in summary["tables"]} == {
+        "patients": (2, 2),
+        "sessions": (1, 1),
+        "empty_table": (0, 0),
+        "readings": (3, 0),
+    }
+    assert "dose" not in summary["columns"]["patients"]
+    assert summary["columns"]["sessions"]["start_time"] == "datetime_shift"
+
+
+def test_anonymize_in_place_keeps_proof_copy_only_when_asked(tmp_path: Path) -> None:
+    db = tmp_path / "local.db"
+    proof = tmp_path / "proof" / "local.db.orig"
+    proof.parent.mkdir()
+    _make_db(db)
+
+    anonymize_in_place(db, proof_copy=proof)
+
+    con = sqlite3.connect(proof)
+    assert con.execute("SELECT first_name FROM patients WHERE id = 1").fetchone() == ("Alice",)
+    con.close()
+
+
+def test_anonymize_in_place_streams_in_batches(tmp_path: Path, monkeypatch) -> None:
+    db = tmp_path / "local.db"
+    con = sqlite3.connect(db)
+    con.execute("CREATE TABLE visits (patient_id TEXT, visit_time TEXT)")
+    con.executemany(
+        "INSERT INTO visits VALUES (?, ?)",
+        [(f"P{i}", f"2024-01-0{i + 1} 08:00:00") for i in range(5)],
+    )
+    con.commit()
+    con.close()
+    monkeypatch.setattr(localdb_anon, "_BATCH_ROWS", 2)
+
+    summary = anonymize_in_place(db, date_shift_days=1)
+
+    con = sqlite3.connect(db)
+    times = [r[0] for r in con.execute("SELECT visit_time FROM visits ORDER BY rowid")]
+    con.close()
+    assert summary["tables"] == [{"table": "visits", "rows": 5, "updated_rows": 5}]
+    assert times == [f"2024-01-0{i + 2} 08:00:00" for i in range(5)]
+
+
+def test_anonymize_in_place_indexed_column_hashed_once(tmp_path: Path, monkeypatch) -> None:
+    db = tmp_path / "local.db"
+    con = sqlite3.connect(db)
+    con.execute("CREATE TABLE visits (patient_id TEXT, note_id INTEGER)")
+    con.execute("CREATE INDEX ix_visits_patient ON visits(patient_id)")
+    con.executemany(
+        "INSERT INTO visits VALUES (?, ?)", [(f"{100000 + i}", i) for i in range(500)]
+    )
+    con.commit()
+    con.close()
+    monkeypatch.setattr(localdb_anon, "_BATCH_ROWS", 64)
+
+    summary = anonymize_in_place(db)
+
+    con = sqlite3.connect(db)
+    rows = con.execute("SELECT patient_id, note_id FROM visits ORDER BY note_id").fetchall()
+    con.close()
+    expected = [(localdb_anon._numhash(f"{100000 + i}", digits=6), i) for i in range(500)]
+    assert rows == expected
+    assert summary["tables"] == [{"table": "visits", "rows": 500, "updated_rows": 500}]
+
+
+def test_anonymize_in_place_rolls_back_on_error(tmp_path: Path, monkeypatch) -> None:
+    db = tmp_path / "local.db"
+    _make_db(db)
+    before = db.read_bytes()
+    real = localdb_anon._build_upd
+    calls = []
+
+    def flaky(table, set_cols, where_cols):
+        calls.append(table)
+        if len(calls) > 1:
+            return "UPDATE no_such_table SET x = ?"
+        return real(table, set_cols, where_cols)
+
+    monkeypatch.setattr(localdb_anon, "_build_upd", flaky)
+
+    with pytest.raises(sqlite3.OperationalError):
+        anonymize_in_place(db)
+
+    # The first table was rewritten before the failure; nothing of it is kept.
+    assert calls[0] == "patients"
+    con = sqlite3.connect(db)
+    assert con.execute("SELECT first_name FROM patients ORDER BY rowid").fetchall() == [("Alice",), (None,)]
+    con.close()
+    assert db.read_bytes() == before
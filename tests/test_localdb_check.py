@@ -0,0 +1,192 @@
+# PURPOSE: Unit tests for local.db checker helpers.
+# INPUTS: Small in-memory SQLite databases.
+# OUTPUTS: Assertions on scanned values and findings.
+# NOTES: The end-to-end CLI run is covered by test_localdb_checker_fixture.
+from __future__ import annotations
+
+import dataclasses
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+import src.localdb_check as localdb_check
+from src.localdb_check import (
+    Finding,
+    check_sessions_table,
+    connect_sqlite,
+    fetch_values,
+    find_matching_columns,
+    is_suspicious_value,
+    list_columns,
+    list_tables,
+    safe_select_nonnull_distinct,
+    scan_candidate_values,
+    snapshot_schema,
+)
+
+
+def _sessions_db(rows: list[tuple]) -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE Sessions (Id INTEGER PRIMARY KEY, FirstName TEXT, LastName TEXT)")
+    conn.executemany("INSERT INTO Sessions (FirstName, LastName) VALUES (?, ?)", rows)
+    return conn
+
+
+def test_scan_candidate_values_one_pass_per_column_distinct() -> None:
+    conn = _sessions_db(
+        [("CASE", "CASE")] * 3
+        + [("Alice", "CASE"), ("Alice", None), ("CASE", "Smith"), (None, "Jones"), ("Bob", "Smith")]
+    )
+
+    values = scan_candidate_values(conn, "Sessions", ["FirstName", "LastName"], exclude="CASE")
+
+    assert values == {"FirstName": ["Alice", "Bob"], "LastName": ["Smith", "Jones"]}
+    assert scan_candidate_values(conn, "Sessions", ["FirstName"], per_column=1) == {"FirstName": ["CASE"]}
+
+
+def test_check_sessions_table_finds_value_past_other_column_matches() -> None:
+    # LastName only goes bad long after FirstName has filled its quota.
+    conn = _sessions_db([(f"Name{i}", "CASE") for i in range(1500)] + [("CASE", "Smith")])
+
+    findings = {f.column: f for f in check_sessions_table(conn, "CASE")}
+
+    assert findings["FirstName"].severity == "FAIL"
+    assert findings["LastName"].severity == "FAIL"
+    assert findings["LastName"].examples == ("Smith",)
+
+
+def test_is_suspicious_value_reasons() -> None:
+    cases = {
+        None: (False, "null"),
+        "  ": (False, "empty"),
+        "CASE": (False, "matches_expected"),
+        "Redacted": (False, "placeholder"),
+        "a@b.org": (True, "email_like"),
+        "Anne-Marie": (True, "name_like_single_token"),
+        "Doe,Jane": (True, "contains_whitespace_or_comma"),
+        "Jane\tDoe": (True, "contains_whitespace_or_comma"),
+        "2024-01-02": (True, "date_like"),
+        "12345678": (True, "long_numeric_id_like"),
+        "AB12CD34EF": (True, "long_alphanumeric_id_like"),
+        "x1": (True, "nonempty_not_expected"),
+    }
+    for value, expected in cases.items():
+        assert is_suspicious_value(value, expected="CASE") == expected, value
+
+
+def test_checks_reuse_prefetched_schema() -> None:
+    conn = _sessions_db([("CASE", "CASE")])
+    statements: list[str] = []
+    conn.set_trace_callback(statements.append)
+
+    findings = check_sessions_table(
+        conn,
+        "CASE",
+        tables={"Sessions"},
+        columns_by_table={"Sessions": ["Id", "FirstName", "LastName"]},
+    )
+
+    assert [f.severity for f in findings] == ["INFO", "INFO"]
+    assert not [s for s in statements if "sqlite_master" in s or "table_info" in s]
+
+
+def test_fetch_values_leaves_row_factory_alone() -> None:
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute('CREATE TABLE "odd ""name" (b TEXT, a TEXT)')
+    conn.execute("CREATE TABLE alpha (x INTEGER)")
+
+    assert list_tables(conn) == ["alpha", 'odd "name']
+    assert list_columns(conn, 'odd "name') == ["b", "a"]
+    assert fetch_values(conn, "SELECT ? UNION ALL SELECT ?", (1, 2)) == [1, 2]
+    assert conn.row_factory is sqlite3.Row
+
+
+def test_connect_sqlite_is_query_only(tmp_path: Path) -> None:
+    db = tmp_path / "local.db"
+    sqlite3.connect(db).close()
+
+    conn = connect_sqlite(str(db))
+    try:
+        assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2
+    finally:
+        conn.close()
+
+
+def test_find_matching_columns_reports_each_column_once() -> None:
+    cols = ["Id", "PatientID", "PatientFirstName"]
+    wanted = ["PatientFirstName", "PatientLastName", "PatientId", "PatientID"]
+
+    assert find_matching_columns(cols, wanted) == ["PatientFirstName", "PatientID"]
+
+
+def test_snapshot_schema_matches_per_table_queries() -> None:
+    conn = _sessions_db([])
+    conn.execute('CREATE TABLE "odd ""name" (b TEXT, a TEXT)')
+    conn.execute("CREATE TABLE AuditLogRecords (AuditRecordBase_Type TEXT)")
+    statements: list[str] = []
+    conn.set_trace_callback(statements.append)
+
+    schema = snapshot_schema(conn)
+
+    assert len([s for s in statements if not s.startswith("--")]) == 1
+    assert schema == {t: list_columns(conn, t) for t in list_tables(conn)}
+    assert list(schema) == ["AuditLogRecords", "Sessions", 'odd "name']
+
+
+def test_safe_select_nonnull_distinct_streams_without_distinct() -> None:
+    conn = _sessions_db([("Alice", None), ("Alice", None), (None, None), ("Bob", None), ("Carol", None)])
+    statements: list[str] = []
+    conn.set_trace_callback(statements.append)
+
+    assert safe_select_nonnull_distinct(conn, "Sessions", "FirstName") == ["Alice", "Bob", "Carol"]
+    assert safe_select_nonnull_distinct(conn, "Sessions", "FirstName", limit=2) == ["Alice", "Bob"]
+    assert safe_select_nonnull_distinct(conn, "Sessions", "LastName") == []
+    assert not [s for s in statements if "DISTINCT" in s]
+
+
+def test_emit_matches_stdlib_without_orjson(tmp_path: Path, monkeypatch) -> None:
+    report = {"db": "local.db", "findings": [{"message": "Café", "examples": ["a", "b"]}], "big": 2**70}
+    small = {k: v for k, v in report.items() if k != "big"}
+
+    for name, payload in (("fast.json", small), ("big.json", report)):
+        localdb_check._emit(payload, str(tmp_path / name))
+    monkeypatch.setattr(localdb_check, "orjson", None)
+    localdb_check._emit(small, str(tmp_path / "plain.json"))
+    localdb_check._emit(small, None)
+
+    for name, payload in (("fast.json", small), ("big.json", report), ("plain.json", small)):
+        assert json.loads((tmp_path / name).read_text(encoding="utf-8")) == payload
+
+
+def test_finding_is_frozen_and_serializes_shallowly() -> None:
+    finding = Finding("FAIL", "ANON", "Sessions", "FirstName", "bad", examples=("Alice",))
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        finding.severity = "INFO"  # type: ignore[misc]
+    assert localdb_check._finding_dicts([finding]) == [dataclasses.asdict(finding)]
+    assert Finding("INFO", "SCHEMA", None, None, "ok").examples == ()
+
+
+def test_check_sessions_table_heuristics_when_case_id_not_enforced() -> None:
+    conn = _sessions_db([("anon", "Redacted"), ("Jane Doe", "unknown"), (" CASE ", "CASE")])
+
+    findings = {f.column: f for f in check_sessions_table(conn, "CASE")}
+    relaxed = {f.column: f for f in check_sessions_table(conn, "CASE", require_equal_caseid=False)}
+
+    assert findings["FirstName"].examples == ("anon", "Jane Doe")
+    assert relaxed["FirstName"].examples == ("Jane Doe", " CASE ")
+    assert relaxed["LastName"].examples == ("CASE",)
+
+
+def test_scan_candidate_values_skips_placeholders() -> None:
+    conn = _sessions_db([(" ANON ", "Smith"), ("Alice", "Redacted"), ("patient", "CASE"), ("\tunknown\t", None)])
+
+    values = scan_candidate_values(
+        conn, "Sessions", ["FirstName", "LastName"], exclude="CASE", skip_placeholders=True
+    )
+
+    assert values == {"FirstName": ["Alice"], "LastName": ["Smith"]}
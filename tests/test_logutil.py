@@ -0,0 +1,303 @@
+# PURPOSE: Unit tests for logutil copy, hashing, and step-timing helpers.
+# INPUTS: Temporary files of varying sizes.
+# OUTPUTS: Assertions on copied content, metadata, and digests.
+# NOTES: Uses sizes that straddle the copy buffer boundary.
+from __future__ import annotations
+
+import errno
+import hashlib
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import src.logutil as logutil
+from src.logutil import (
+    StepTimer,
+    copy_file_buffered,
+    copy_file_hashed,
+    copy_with_integrity,
+    flush_log_file,
+    init_logger,
+    sha256_file,
+)
+
+
+def _write_bytes(path: Path, size: int) -> bytes:
+    data = os.urandom(size)
+    path.write_bytes(data)
+    return data
+
+
+def test_copy_file_buffered_preserves_content_and_mtime(tmp_path: Path) -> None:
+    src = tmp_path / "src.bin"
+    dst = tmp_path / "dst.bin"
+    data = _write_bytes(src, 1024 * 1024 * 2 + 17)
+    os.utime(src, (1_600_000_000, 1_600_000_000))
+
+    copy_file_buffered(src, dst)
+
+    assert dst.read_bytes() == data
+    assert int(dst.stat().st_mtime) == 1_600_000_000
+
+
+def test_copy_file_buffered_empty_file(tmp_path: Path) -> None:
+    src = tmp_path / "empty.pdf"
+    src.write_bytes(b"")
+    dst = tmp_path / "out.pdf"
+
+    copy_file_buffered(src, dst)
+
+    assert dst.read_bytes() == b""
+
+
+def test_copy_with_integrity_reports_matching_hashes(tmp_path: Path) -> None:
+    src = tmp_path / "input.zip"
+    dst = tmp_path / "scratch" / "input.zip.bak"
+    data = _write_bytes(src, 300_000)
+
+    info = copy_with_integrity(src, dst, retries=0)
+
+    expected = hashlib.sha256(data).hexdigest()
+    assert info["ok"] is True
+    assert info["src_sha256"] == expected
+    assert info["dst_sha256"] == expected
+    assert sha256_file(dst) == expected
+
+
+def test_copy_with_integrity_reads_source_once(tmp_path: Path, monkeypatch) -> None:
+    src = tmp_path / "input.zip"
+    dst = tmp_path / "scratch" / "input.zip.bak"
+    _write_bytes(src, 4096)
+    hashed = []
+    real = logutil.sha256_file
+
+    def _tracking(path: Path) -> str:
+        hashed.append(Path(path))
+        return real(path)
+
+    monkeypatch.setattr(logutil, "sha256_file", _tracking)
+
+    assert copy_with_integrity(src, dst, retries=0)["ok"] is True
+    assert hashed == [dst]
+
+
+def test_copy_with_integrity_drops_large_source_from_cache(tmp_path: Path, monkeypatch) -> None:
+    src = tmp_path / "input.zip"
+    dst = tmp_path / "scratch" / "input.zip.bak"
+    _write_bytes(src, 4096)
+    advised = []
+    monkeypatch.setattr(logutil, "_fadvise", lambda path, advice: advised.append((Path(path), advice)))
+
+    copy_with_integrity(src, dst, retries=0)
+    monkeypatch.setattr(logutil, "_DROP_CACHE_MIN", 4096)
+    copy_with_integrity(src, dst, retries=0)
+
+    assert advised == [
+        (dst, "POSIX_FADV_WILLNEED"),
+        (dst, "POSIX_FADV_WILLNEED"),
+        (src, "POSIX_FADV_DONTNEED"),
+    ]
+
+
+def test_step_timer_records_under_shared_lock() -> None:
+    results: dict = {}
+    lock = threading.Lock()
+    logger = logging.getLogger("test_step_timer")
+
+    def _step(name: str) -> None:
+        with StepTimer(logger=logger, step_name=name, results=results, lock=lock):
+            pass
+
+    threads = [threading.Thread(target=_step, args=(f"step{i}",)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(results) == [f"step{i}" for i in range(8)]
+    assert all(r["status"] == "PASS" for r in results.values())
+
+
+def test_sha256_file_across_hash_slices(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(logutil, "_HASH_SLICE", 4096)
+    target = tmp_path / "MRI.zip"
+    data = _write_bytes(target, 4096 * 3 + 17)
+    empty = tmp_path / "empty.db"
+    empty.write_bytes(b"")
+    expected = hashlib.sha256(data).hexdigest()
+
+    assert sha256_file(target) == expected
+    monkeypatch.setattr(logutil, "_MMAP_MIN", 0)
+    assert sha256_file(target) == expected
+    assert sha256_file(empty) == hashlib.sha256(b"").hexdigest()
+
+
+def test_sha256_file_small_file_without_file_digest(tmp_path: Path, monkeypatch) -> None:
+    target = tmp_path / "report.pdf"
+    data = _write_bytes(target, 70_000)
+    expected = hashlib.sha256(data).hexdigest()
+
+    assert sha256_file(target) == expected
+    monkeypatch.delattr(hashlib, "file_digest", raising=False)
+    monkeypatch.setattr(logutil, "_COPY_BUF_SIZE", 4096)
+    monkeypatch.setattr(logutil, "_COPY_BUF", threading.local())
+    assert sha256_file(target) == expected
+
+
+@pytest.mark.parametrize("copy_range,sendfile", [(False, False), (False, True), (True, False)])
+def test_copy_file_buffered_copy_paths(
+    tmp_path: Path, monkeypatch, copy_range: bool, sendfile: bool
+) -> None:
+    monkeypatch.setattr(logutil, "_COPY_FILE_RANGE", logutil._COPY_FILE_RANGE and copy_range)
+    monkeypatch.setattr(logutil, "_SENDFILE", logutil._SENDFILE and sendfile)
+    src = tmp_path / "report.pdf"
+    dst = tmp_path / "Misc" / "report.pdf"
+    dst.parent.mkdir()
+    data = _write_bytes(src, 1024 * 1024 + 5)
+
+    copy_file_buffered(src, dst)
+
+    assert dst.read_bytes() == data
+
+
+def test_copy_file_buffered_falls_back_on_cross_device(tmp_path: Path, monkeypatch) -> None:
+    def _exdev(*_args):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(logutil, "_COPY_FILE_RANGE", True)
+    monkeypatch.setattr(logutil.os, "copy_file_range", _exdev, raising=False)
+    src = tmp_path / "MRI.zip"
+    dst = tmp_path / "scratch" / "MRI.zip.bak"
+    dst.parent.mkdir()
+    data = _write_bytes(src, 70_000)
+
+    copy_file_buffered(src, dst)
+
+    assert dst.read_bytes() == data
+
+
+def test_copy_file_hashed_returns_digest_of_copy(tmp_path: Path) -> None:
+    src = tmp_path / "report.pdf"
+    dst = tmp_path / "Misc" / "report.pdf"
+    dst.parent.mkdir()
+    data = _write_bytes(src, 2 * 1024 * 1024 + 11)
+
+    used, digest = copy_file_hashed(src, dst, "blake2b")
+
+    assert used == "blake2b"
+    assert digest == hashlib.blake2b(data).hexdigest()
+    assert dst.read_bytes() == data
+
+
+def test_init_logger_flushes_file_records_on_warning(tmp_path: Path) -> None:
+    logger, log_file, _ = init_logger(case="CASE", run_id="RUN", log_dir=tmp_path)
+    try:
+        logger.info("buffered info line")
+        logger.warning("flush trigger")
+        text = log_file.read_text(encoding="utf-8")
+        assert "buffered info line" in text
+        assert "flush trigger" in text
+    finally:
+        for handler in list(logger.handlers):
+            handler.close()
+        logger.handlers.clear()
+
+
+def test_flush_log_file_writes_buffered_records(tmp_path: Path) -> None:
+    logger, log_file, _ = init_logger(case="CASE", run_id="FLUSH", log_dir=tmp_path)
+    try:
+        logger.info("held in the memory buffer")
+        flush_log_file(logger)
+        assert "held in the memory buffer" in log_file.read_text(encoding="utf-8")
+    finally:
+        for handler in list(logger.handlers):
+            handler.close()
+        logger.handlers.clear()
+
+
+def test_link_or_copy_falls_back_to_copy(tmp_path: Path, monkeypatch) -> None:
+    src = tmp_path / "report.pdf"
+    data = _write_bytes(src, 2048)
+
+    linked_dst = tmp_path / "Misc" / "linked.pdf"
+    linked_dst.parent.mkdir()
+    assert logutil.link_or_copy(src, linked_dst) is True
+    assert os.path.samefile(src, linked_dst)
+
+    def _cross_device(*_args):
+        raise OSError(18, "Invalid cross-device link")
+
+    monkeypatch.setattr(logutil.os, "link", _cross_device)
+    copied_dst = tmp_path / "Misc" / "copied.pdf"
+    assert logutil.link_or_copy(src, copied_dst) is False
+    assert not os.path.samefile(src, copied_dst)
+    assert copied_dst.read_bytes() == data
+
+
+def test_discard_tree_moves_into_trash_dir(tmp_path: Path) -> None:
+    root = tmp_path / "MR DICOM" / "MRI-TEST"
+    (root / "series").mkdir(parents=True)
+    for idx in range(3):
+        _write_bytes(root / "series" / f"img{idx}.dcm", 64)
+    scratch = tmp_path / "scratch"
+    scratch.mkdir()
+
+    trash = logutil.discard_tree(root, trash_dir=scratch)
+
+    assert not root.exists()
+    assert list((tmp_path / "MR DICOM").iterdir()) == []
+    assert trash is not None and trash.parent == scratch
+
+
+def test_discard_tree_logs_failed_background_delete(tmp_path: Path, monkeypatch) -> None:
+    root = tmp_path / "scratch"
+    (root / "sub").mkdir(parents=True)
+    monkeypatch.setattr(logutil, "_FAST_RM", "false")
+    records: list[logging.LogRecord] = []
+    log = logging.getLogger("test_discard_tree")
+    handler = logging.Handler()
+    handler.emit = records.append
+    log.addHandler(handler)
+    try:
+        trash = logutil.discard_tree(root, logger=log)
+        deadline = time.monotonic() + 10
+        while not records and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        log.removeHandler(handler)
+
+    assert trash is not None and trash.exists()
+    assert records and "Background delete" in records[0].getMessage()
+
+
+def test_fast_rmtree_without_rm_binary(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(logutil, "_FAST_RM", None)
+    root = tmp_path / "TDC_staged"
+    for idx in range(5):
+        (root / f"d{idx}" / "nested").mkdir(parents=True)
+        _write_bytes(root / f"d{idx}" / "nested" / "f.bin", 16)
+
+    logutil.fast_rmtree(root)
+
+    assert not root.exists()
+
+
+def test_rich_lookup_is_resolved_once(tmp_path: Path) -> None:
+    logutil._rich_classes.cache_clear()
+    try:
+        for run_id in ("R1", "R2"):
+            logger, _, rich_used = init_logger(case="CASE", run_id=run_id, log_dir=tmp_path)
+            for handler in list(logger.handlers):
+                handler.close()
+            logger.handlers.clear()
+            assert rich_used is (logutil._rich_classes() is not None)
+        with logutil.StatusManager() as status:
+            status.update("step")
+
+        assert logutil._rich_classes.cache_info().misses == 1
+    finally:
+        logutil._rich_classes.cache_clear()
@@ -0,0 +1,236 @@
+# PURPOSE: Unit tests for manifest metadata and writing helpers.
+# INPUTS: Temporary files and payload dicts.
+# OUTPUTS: Assertions on manifest JSON contents and file metadata.
+# NOTES: No controller run required.
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import src.manifest as manifest_mod
+from src.manifest import file_metadata, file_metadata_many, write_manifest
+
+
+def test_write_manifest_roundtrip(tmp_path: Path) -> None:
+    path = tmp_path / "run_logs" / "CASE__RUN__manifest.json"
+    payload = {"run_id": "RUN", "case": "CASE", "steps": {"MRI": {"status": "PASS"}}}
+
+    write_manifest(path, payload)
+
+    assert json.loads(path.read_text(encoding="utf-8")) == payload
+    assert [p.name for p in path.parent.iterdir()] == [path.name]
+
+
+def test_write_manifest_overwrites(tmp_path: Path) -> None:
+    path = tmp_path / "manifest.json"
+    write_manifest(path, {"status": "FAILED", "plan": ["a", "b", "c"]})
+    write_manifest(path, {"status": "SUCCESS"})
+
+    assert json.loads(path.read_text(encoding="utf-8")) == {"status": "SUCCESS"}
+
+
+def test_write_manifest_concurrent_writers_use_distinct_temp_files(tmp_path: Path) -> None:
+    path = tmp_path / "manifest.json"
+    payloads = [{"writer": i, "plan": list(range(2000))} for i in range(8)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda p: write_manifest(path, p), payloads))
+
+    assert json.loads(path.read_text(encoding="utf-8")) in payloads
+    assert [p.name for p in tmp_path.iterdir()] == [path.name]
+
+
+def test_write_manifest_matches_stdlib_without_orjson(tmp_path: Path, monkeypatch) -> None:
+    payload = {"case": "Ünïcode", "steps": {"MRI": {"duration_s": 1.25}}, "big": 2**70}
+    with_fast = tmp_path / "fast.json"
+    without_fast = tmp_path / "plain.json"
+
+    write_manifest(with_fast, payload)
+    monkeypatch.setattr(manifest_mod, "orjson", None)
+    write_manifest(without_fast, payload)
+
+    assert with_fast.read_bytes() == without_fast.read_bytes()
+    assert json.loads(without_fast.read_text(encoding="utf-8")) == payload
+
+
+def test_file_metadata_missing_path(tmp_path: Path) -> None:
+    missing = tmp_path / "nope.zip"
+    assert file_metadata(missing) == {"path": str(missing), "exists": False}
+
+
+def test_file_metadata_hash_only_when_requested(tmp_path: Path) -> None:
+    target = tmp_path / "report.pdf"
+    target.write_bytes(b"%PDF-1.4\n")
+
+    plain = file_metadata(target)
+    hashed = file_metadata(target, compute_hash=True)
+
+    assert plain["exists"] is True
+    assert plain["size_bytes"] == 9
+    assert "sha256" not in plain
+    assert hashed["sha256"] == hashlib.sha256(b"%PDF-1.4\n").hexdigest()
+    assert "sha256" not in file_metadata(target)
+
+
+def test_file_metadata_directory_has_no_hash(tmp_path: Path) -> None:
+    meta = file_metadata(tmp_path, compute_hash=True)
+    assert meta["exists"] is True
+    assert "sha256" not in meta
+
+
+def test_file_metadata_many_preserves_order(tmp_path: Path) -> None:
+    paths = []
+    for idx in range(5):
+        target = tmp_path / f"session_{idx}.zip"
+        target.write_bytes(bytes([idx]) * (idx + 1))
+        paths.append(target)
+    paths.append(tmp_path / "missing.zip")
+
+    metas = file_metadata_many(paths, compute_hash=True)
+
+    assert [m["path"] for m in metas] == [str(p) for p in paths]
+    assert metas[2]["sha256"] == hashlib.sha256(bytes([2]) * 3).hexdigest()
+    assert metas[-1] == {"path": str(paths[-1]), "exists": False}
+
+
+def test_file_metadata_blake_digest_records_algo(tmp_path: Path) -> None:
+    target = tmp_path / "session.zip"
+    target.write_bytes(b"session-bytes")
+
+    b2 = file_metadata(target, compute_hash=True, hash_algo="blake2b")
+    b3 = file_metadata(target, compute_hash=True, hash_algo="blake3")
+
+    assert b2["hash_algo"] == "blake2b"
+    assert b2["digest"] == hashlib.blake2b(b"session-bytes").hexdigest()
+    assert "sha256" not in b2
+    # blake3 is optional; without it the digest falls back to blake2b.
+    assert b3["hash_algo"] in ("blake3", "blake2b")
+    if b3["hash_algo"] == "blake2b":
+        assert b3["digest"] == b2["digest"]
+
+
+def test_file_metadata_metadata_mode_skips_content(tmp_path: Path) -> None:
+    target = tmp_path / "session.zip"
+    target.write_bytes(b"one")
+    first = file_metadata(target, compute_hash=True, hash_mode="metadata")
+
+    target.write_bytes(b"two")
+    os.utime(target, ns=(1_000_000_000, 1_000_000_000))
+    second = file_metadata(target, compute_hash=True, hash_mode="metadata")
+
+    assert first["hash_mode"] == "metadata"
+    assert "sha256" not in first
+    assert first["digest"] != hashlib.sha256(b"one").hexdigest()
+    assert first["digest"] != second["digest"]
+
+
+def test_file_metadata_reuses_digest_until_file_changes(tmp_path: Path, monkeypatch) -> None:
+    target = tmp_path / "local.db"
+    target.write_bytes(b"before")
+    calls = []
+    real_digest = manifest_mod.file_digest
+
+    def _counting_digest(path: Path, algo: str = "sha256"):
+        calls.append(path)
+        return real_digest(path, algo)
+
+    monkeypatch.setattr(manifest_mod, "file_digest", _counting_digest)
+    manifest_mod._digest_cached.cache_clear()
+
+    first = file_metadata(target, compute_hash=True)
+    again = file_metadata(target, compute_hash=True)
+    target.write_bytes(b"after!!")
+    changed = file_metadata(target, compute_hash=True)
+
+    assert first["sha256"] == again["sha256"]
+    assert changed["sha256"] == hashlib.sha256(b"after!!").hexdigest()
+    assert len(calls) == 2
+
+
+def test_write_manifest_serializes_nested_paths(tmp_path: Path, monkeypatch) -> None:
+    payload = {"config": {"root": tmp_path, "run": {"flags": {"scratch": tmp_path / "s"}}}}
+    expected = {"config": {"root": str(tmp_path), "run": {"flags": {"scratch": str(tmp_path / "s")}}}}
+
+    write_manifest(tmp_path / "fast.json", payload)
+    monkeypatch.setattr(manifest_mod, "orjson", None)
+    write_manifest(tmp_path / "plain.json", payload)
+
+    for name in ("fast.json", "plain.json"):
+        assert json.loads((tmp_path / name).read_text(encoding="utf-8")) == expected
+
+
+def test_record_digest_is_used_by_file_metadata(tmp_path: Path, monkeypatch) -> None:
+    target = tmp_path / "report.pdf"
+    target.write_bytes(b"%PDF-1.4\n")
+
+    def _fail(*_args, **_kwargs):
+        raise AssertionError("file should not be re-read")
+
+    monkeypatch.setattr(manifest_mod, "file_digest", _fail)
+    manifest_mod.record_digest(target, "sha256", "sha256", "abc123")
+
+    meta = file_metadata(target, compute_hash=True)
+    assert meta["digest"] == "abc123"
+
+
+def test_file_metadata_uses_precomputed_sha256(tmp_path: Path, monkeypatch) -> None:
+    target = tmp_path / "MRI.zip"
+    target.write_bytes(b"mri-bytes")
+    other = tmp_path / "TDC.zip"
+    other.write_bytes(b"tdc-bytes")
+    digest = hashlib.sha256(b"mri-bytes").hexdigest()
+
+    def _fail(*_args, **_kwargs):
+        raise AssertionError("file should not be re-read")
+
+    monkeypatch.setattr(manifest_mod, "_digest_cached", _fail)
+    meta = file_metadata(target, compute_hash=True, hash_algo="blake3", precomputed_sha256=digest)
+    assert meta["hash_algo"] == "sha256"
+    assert meta["sha256"] == digest
+
+    monkeypatch.undo()
+    metas = file_metadata_many([target, other], compute_hash=True, precomputed_sha256=[digest])
+    assert metas[0]["digest"] == digest
+    assert metas[1]["sha256"] == hashlib.sha256(b"tdc-bytes").hexdigest()
+
+
+def test_hash_cache_sidecar_skips_unchanged_files(tmp_path: Path, monkeypatch) -> None:
+    case_dir = tmp_path / "CASE"
+    target = case_dir / "TDC Sessions" / "session.zip"
+    target.parent.mkdir(parents=True)
+    target.write_bytes(b"session-bytes")
+    other = tmp_path / "OTHER" / "other.zip"
+    other.parent.mkdir()
+    other.write_bytes(b"other-bytes")
+    monkeypatch.setenv("LOCALAPPDATA", str(tmp_path / "cache"))
+    sidecar = manifest_mod.hash_cache_path(case_dir)
+    assert not sidecar.is_relative_to(case_dir)
+    digest = hashlib.sha256(b"session-bytes").hexdigest()
+
+    manifest_mod._KNOWN_DIGESTS.clear()
+    manifest_mod._digest_cached.cache_clear()
+    assert file_metadata(target, compute_hash=True)["sha256"] == digest
+    file_metadata(other, compute_hash=True)
+    manifest_mod.save_hash_cache(sidecar, case_dir)
+    # Only this case's files, relative to the case dir; they leave memory.
+    assert list(json.loads(sidecar.read_bytes())) == ["TDC Sessions/session.zip"]
+    assert [k[0] for k in manifest_mod._KNOWN_DIGESTS] == [os.path.abspath(other)]
+
+    # A fresh process: nothing known until the sidecar is loaded.
+    manifest_mod._KNOWN_DIGESTS.clear()
+    manifest_mod._digest_cached.cache_clear()
+
+    def _fail(*_args, **_kwargs):
+        raise AssertionError("file should not be re-read")
+
+    monkeypatch.setattr(manifest_mod, "file_digest", _fail)
+    manifest_mod.load_hash_cache(sidecar, case_dir)
+    assert file_metadata(target, compute_hash=True)["sha256"] == digest
+
+    monkeypatch.undo()
+    target.write_bytes(b"changed-bytes!")
+    assert file_metadata(target, compute_hash=True)["sha256"] == hashlib.sha256(b"changed-bytes!").hexdigest()
+    manifest_mod.load_hash_cache(tmp_path / "missing.json", case_dir)
@@ -83,3 +83,23 @@ def test_matlab_failure_includes_log_tail(
     message = str(excinfo.value)
     assert str(log_path) in message
     assert "line 39" in message
+
+
+def test_matlab_output_logged_as_one_record_per_stream(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    def fake_run(*args, **kwargs) -> subprocess.CompletedProcess[str]:
+        return subprocess.CompletedProcess(args[0], 0, stdout="a\n\nb\nc\n", stderr="warn 1\nwarn 2\n")
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+
+    with caplog.at_level(logging.INFO, logger="test_matlab_runner_output"):
+        run_matlab_batch(
+            matlab_exe=Path("C:/fake/matlab.exe"),
+            log_path=tmp_path / "PEDA_run_log.txt",
+            batch_cmd="cd('X');MAIN_PEDA('Y')",
+            logger=logging.getLogger("test_matlab_runner_output"),
+        )
+
+    messages = [r.getMessage() for r in caplog.records if r.getMessage().startswith("MATLAB")]
+    assert messages == ["MATLAB stdout:\na\nb\nc", "MATLAB stderr:\nwarn 1\nwarn 2"]
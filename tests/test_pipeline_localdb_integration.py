@@ -118,3 +118,107 @@ def test_pipeline_localdb_missing_skips() -> None:
             ]
         )
         assert result.returncode == 0
+
+
+def test_pipeline_report_already_in_misc_is_kept() -> None:
+    case_id = "093_01-098"
+    with TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        case_dir = root / case_id
+        (case_dir / "MR DICOM").mkdir(parents=True, exist_ok=True)
+        (case_dir / "TDC Sessions").mkdir(parents=True, exist_ok=True)
+        report = case_dir / "Misc" / "TreatmentReport.pdf"
+        report.parent.mkdir(parents=True)
+        report.write_bytes(b"%PDF-1.4 report")
+
+        result = _run_controller(
+            [
+                "--root",
+                str(root),
+                "--case",
+                case_id,
+                "--mri-input",
+                str(root / "dummy_mri.zip"),
+                "--tdc-input",
+                str(root / "dummy_tdc.zip"),
+                "--pdf-input",
+                str(report),
+                "--skip-mri",
+                "--skip-tdc",
+                "--no-localdb-enabled",
+                "--hash-outputs",
+            ]
+        )
+        assert result.returncode == 0, result.stdout + result.stderr
+        assert report.read_bytes() == b"%PDF-1.4 report"
+        assert [p.name for p in report.parent.iterdir()] == [report.name]
+
+
+def test_pipeline_strict_localdb_failure_leaves_no_report() -> None:
+    case_id = "093_01-098"
+    session_name = "_2025-11-05--07-05-25 122867438"
+    with TemporaryDirectory() as tmp:
+        paths = make_dummy_case_tree(Path(tmp), case_id, session_name)
+        report = paths.root / "TreatmentReport.pdf"
+        report.write_bytes(b"%PDF-1.4 report")
+
+        try:
+            result = _run_controller(
+                [
+                    "--root",
+                    str(paths.root),
+                    "--case",
+                    case_id,
+                    "--mri-input",
+                    str(paths.root / "dummy_mri.zip"),
+                    "--tdc-input",
+                    str(paths.root / "dummy_tdc.zip"),
+                    "--pdf-input",
+                    str(report),
+                    "--skip-mri",
+                    "--skip-tdc",
+                    "--localdb-enabled",
+                    "--localdb-check-only",
+                    "--localdb-strict",
+                    "--localdb-path",
+                    str(paths.db_path),
+                ]
+            )
+            assert result.returncode != 0
+            assert report.exists()
+            misc = paths.case_dir / "Misc"
+            assert not misc.exists() or not any(misc.iterdir())
+        finally:
+            cleanup_sqlite_sidecars(paths.db_path)
+
+
+def test_pipeline_case_root_scratch_cleanup_leaves_no_folder() -> None:
+    case_id = "093_01-098"
+    with TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        case_dir = root / case_id
+        for name in ("Misc", "MR DICOM", "TDC Sessions"):
+            (case_dir / name).mkdir(parents=True, exist_ok=True)
+
+        result = _run_controller(
+            [
+                "--root",
+                str(root),
+                "--case",
+                case_id,
+                "--mri-input",
+                str(root / "dummy_mri.zip"),
+                "--tdc-input",
+                str(root / "dummy_tdc.zip"),
+                "--skip-mri",
+                "--skip-tdc",
+                "--no-localdb-enabled",
+                "--scratch-policy",
+                "case_root",
+                "--clean-scratch",
+            ]
+        )
+        assert result.returncode == 0, result.stdout + result.stderr
+        # Deleted in-process, never renamed aside to scratch.deleting.* under case_dir.
+        assert "deleting in background" not in result.stdout + result.stderr
+        assert not [p.name for p in case_dir.iterdir() if p.name.startswith("scratch")]
@@ -3,9 +3,14 @@
 # OUTPUTS: Extracted folders under dest_root.
 from __future__ import annotations
 
+import shutil
+import subprocess
 import zipfile
 from pathlib import Path
 
+import pytest
+
+import src.archive_utils as archive_utils
 from src.pipeline_steps.unzip_inputs import expand_archives
 
 
@@ -40,3 +45,112 @@ def test_expand_archives_suffix_on_collision(tmp_path: Path) -> None:
     assert dest.is_dir()
     assert (dest / "file.txt").is_file()
     assert summary["expanded"] == 1
+
+
+def test_extract_archive_without_unzip_binary(tmp_path: Path, monkeypatch) -> None:
+    src = tmp_path / "gamma.zip"
+    _make_zip(src, "nested/file.txt", "data")
+    monkeypatch.setattr(archive_utils, "find_7z", lambda: None)
+
+    archive_utils.extract_archive(src, tmp_path / "native")
+    monkeypatch.setattr(archive_utils, "_UNZIP", None)
+    archive_utils.extract_archive(src, tmp_path / "python")
+
+    for name in ("native", "python"):
+        assert (tmp_path / name / "nested" / "file.txt").read_text() == "data"
+
+
+def test_expand_archives_parallel_claims_distinct_dests(tmp_path: Path) -> None:
+    first = tmp_path / "a" / "delta.zip"
+    second = tmp_path / "b" / "delta.zip"
+    _make_zip(first, "one.txt", "1")
+    _make_zip(second, "two.txt", "2")
+    dest_root = tmp_path / "out"
+
+    summary = expand_archives([first, second], dest_root)
+
+    assert summary["expanded"] == 2
+    assert (dest_root / "delta" / "one.txt").is_file()
+    assert (dest_root / "delta__1" / "two.txt").is_file()
+    assert [item["dest"] for item in summary["items"]] == [
+        str(dest_root / "delta"),
+        str(dest_root / "delta__1"),
+    ]
+
+
+def test_extract_archive_python_fallback_sanitizes_members(tmp_path: Path, monkeypatch) -> None:
+    src = tmp_path / "epsilon.zip"
+    with zipfile.ZipFile(src, "w") as zf:
+        zf.writestr("../escape.txt", "x")
+        zf.writestr("/abs/inner.txt", "y")
+        zf.writestr("empty/", "")
+        zf.writestr("sub/zero.dcm", "")
+        zf.writestr("sub/data.dcm", "z" * 5000)
+    monkeypatch.setattr(archive_utils, "find_7z", lambda: None)
+    monkeypatch.setattr(archive_utils, "_UNZIP", None)
+    dest = tmp_path / "nest" / "out"
+
+    archive_utils.extract_archive(src, dest)
+
+    assert not (tmp_path / "nest" / "escape.txt").exists()
+    assert (dest / "escape.txt").read_text() == "x"
+    assert (dest / "abs" / "inner.txt").read_text() == "y"
+    assert (dest / "empty").is_dir()
+    assert (dest / "sub" / "zero.dcm").stat().st_size == 0
+    assert (dest / "sub" / "data.dcm").read_text() == "z" * 5000
+
+
+def test_extract_archive_python_fallback_checks_crc(tmp_path: Path, monkeypatch) -> None:
+    src = tmp_path / "zeta.zip"
+    with zipfile.ZipFile(src, "w") as zf:
+        zf.writestr("series/img.dcm", "DICM" * 64)
+    raw = bytearray(src.read_bytes())
+    offset = raw.index(b"DICM")
+    raw[offset] ^= 0xFF  # corrupt a stored byte; the CRC no longer matches
+    src.write_bytes(bytes(raw))
+    monkeypatch.setattr(archive_utils, "find_7z", lambda: None)
+    monkeypatch.setattr(archive_utils, "_UNZIP", None)
+
+    with pytest.raises(zipfile.BadZipFile):
+        archive_utils.extract_archive(src, tmp_path / "checked")
+
+
+def test_member_dest_sanitizes_windows_names(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(archive_utils.os, "sep", "\\")
+    dest = archive_utils._member_dest(tmp_path, 'a:b\\c?. /d*<|>"x.dcm ')
+    assert archive_utils._member_dest(tmp_path, "... /. ") is None
+    monkeypatch.undo()
+    assert dest == tmp_path / "a_b" / "c_" / "d_____x.dcm"
+    assert archive_utils._member_dest(tmp_path, "c?. /x") == tmp_path / "c?. " / "x"
+
+
+@pytest.mark.skipif(
+    archive_utils._UNZIP is None or shutil.which("zip") is None, reason="needs zip/unzip"
+)
+def test_extract_archive_encrypted_member_fails_without_prompt(tmp_path: Path, monkeypatch) -> None:
+    (tmp_path / "a.txt").write_text("secret")
+    src = tmp_path / "enc.zip"
+    subprocess.run(
+        ["zip", "-q", "-P", "pw", str(src), "a.txt"], cwd=tmp_path, check=True
+    )
+    monkeypatch.setattr(archive_utils, "find_7z", lambda: None)
+
+    with pytest.raises(RuntimeError, match="unzip failed"):
+        archive_utils.extract_archive(src, tmp_path / "out")
+
+
+@pytest.mark.skipif(
+    archive_utils._UNZIP is None or shutil.which("zip") is None, reason="needs zip/unzip"
+)
+def test_extract_archive_partially_encrypted_zip_fails(tmp_path: Path, monkeypatch) -> None:
+    (tmp_path / "a.txt").write_text("secret")
+    (tmp_path / "b.txt").write_text("plain")
+    src = tmp_path / "mixed.zip"
+    subprocess.run(["zip", "-q", "-P", "pw", str(src), "a.txt"], cwd=tmp_path, check=True)
+    subprocess.run(["zip", "-q", str(src), "b.txt"], cwd=tmp_path, check=True)
+    monkeypatch.setattr(archive_utils, "find_7z", lambda: None)
+
+    # unzip extracts b.txt and exits 1; the skipped a.txt must still fail the call.
+    with pytest.raises(RuntimeError, match="skipped 1 member"):
+        archive_utils.extract_archive(src, tmp_path / "out")
+    assert (tmp_path / "out" / "b.txt").read_text() == "plain"